@@ -0,0 +1,379 @@
+""":mod:`nod2svg.batch` --- Batch conversion
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Converts many Nodal documents, or whole directory trees of them, across a
+pool of worker processes::
+
+    from nod2svg.batch import convert_batch
+
+    for result in convert_batch(['matrices/'], 'svg/'):
+        if result.error:
+            print(result.source, result.error)
+
+With ``incremental=True``, documents are only converted again when they
+have changed since the last run, like :program:`make`. See
+:class:`Manifest`.
+
+.. versionadded:: 0.2.0
+"""
+import collections
+import functools
+import json
+import multiprocessing
+import os
+import tempfile
+
+from .constants import NOD_EXTENSION, SVG_EXTENSION
+from .cache import RenderCache, default_directory, hash_file
+from .main import NodalImage, RENDER_REVISION, VERSION
+
+__all__ = ('BatchResult',
+           'Manifest',
+           'convert',
+           'convert_batch',
+           'iter_jobs',
+           'run_jobs')
+
+#: Name of the :class:`Manifest` kept in output directories.
+MANIFEST_NAME = '.nod2svg-manifest.json'
+# Bumped whenever the manifest layout changes.
+MANIFEST_FORMAT = 1
+
+
+#: The outcome of a single conversion. ``error`` is ``None`` on success,
+#: or a message describing why the document could not be converted.
+#: ``stats`` holds :attr:`~nod2svg.main.NodalImage.stats` when
+#: instrumented, or else ``None``. ``cached`` is ``True`` when the image
+#: was copied from a :class:`~nod2svg.cache.RenderCache`, and ``skipped``
+#: when an incremental batch found it already up to date.
+BatchResult = collections.namedtuple('BatchResult',
+                                     ('source', 'destination', 'error',
+                                      'stats', 'cached', 'skipped'))
+
+# One warm NodalImage per process, reused for every job it converts, and
+# its render options as first created.
+_image = None
+_defaults = None
+# One RenderCache per process, so its running size is kept between jobs.
+_cache = None
+
+
+def _shared_image():
+    global _image, _defaults
+    if _image is None:
+        _image = NodalImage()
+        _defaults = _image.render_options()
+    return _image
+
+
+def _shared_cache(directory, max_size):
+    global _cache
+    if (_cache is None or _cache.directory != directory or
+            _cache.max_size != max_size):
+        _cache = RenderCache(directory, max_size)
+    return _cache
+
+
+class Manifest(object):
+    """
+    Record of the documents each image in an output directory was
+    rendered from, so unchanged documents can be skipped.
+
+    An image is up to date when it exists, was rendered with the same
+    settings, and its document has the same modification time & size as
+    recorded. When only those differ, the document is hashed, and is
+    still up to date if its contents are unchanged.
+
+    :param path: The manifest file. Missing or unreadable manifests are
+                 treated as empty.
+    :type path: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, path):
+        self.path = path
+        #: Maps image paths to the state of the document rendered.
+        self.entries = {}
+        try:
+            with open(path) as fd:
+                data = json.load(fd)
+            if data.get('format') == MANIFEST_FORMAT:
+                self.entries = data['entries']
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def check(self, source, destination, settings):
+        """
+        Test whether ``destination`` is up to date.
+
+        :param source: The path to a Nodal document.
+        :type source: :class:`basestring`
+        :param destination: The path of its image.
+        :type destination: :class:`basestring`
+        :param settings: Everything else affecting the image. See
+                         :meth:`settings`.
+        :type settings: :class:`basestring`
+        :returns: Whether up to date, and the current state of the
+                  document to :meth:`record` after converting it.
+        :rtype: :class:`tuple`
+        """
+        status = os.stat(source)
+        state = {'source': source,
+                 'mtime': status.st_mtime,
+                 'size': status.st_size,
+                 'settings': settings}
+        entry = self.entries.get(destination)
+        if (entry is None or entry.get('source') != source or
+                entry.get('settings') != settings or
+                not os.path.exists(destination)):
+            state['sha256'] = hash_file(source)
+            return False, state
+        if entry['mtime'] == state['mtime'] and entry['size'] == state['size']:
+            state['sha256'] = entry['sha256']
+            return True, state
+        state['sha256'] = hash_file(source)
+        return state['sha256'] == entry['sha256'], state
+
+    def record(self, destination, state):
+        """Record ``state`` from :meth:`check` for ``destination``."""
+        self.entries[destination] = state
+
+    def discard(self, destination):
+        """Forget ``destination``, so it is converted next time."""
+        self.entries.pop(destination, None)
+
+    def save(self):
+        """Write the manifest, replacing the previous one atomically."""
+        directory = os.path.dirname(self.path) or '.'
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as target:
+                json.dump({'format': MANIFEST_FORMAT,
+                           'entries': self.entries}, target,
+                          sort_keys=True)
+            getattr(os, 'replace', os.rename)(temporary, self.path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def settings(suffix, options):
+        """
+        Fingerprint the nod2svg version & render revision, output
+        ``suffix``, and the full set of render ``options`` given.
+
+        :rtype: :class:`basestring`
+        """
+        rendered = NodalImage(**options).render_options()
+        return json.dumps([VERSION, RENDER_REVISION, suffix, rendered],
+                          sort_keys=True)
+
+
+def iter_jobs(paths, output_dir, suffix=SVG_EXTENSION):
+    """
+    Expand input paths into ``(source, destination)`` pairs.
+
+    Directories are walked recursively for ``.nod`` documents, and their
+    relative layout is mirrored beneath ``output_dir``. Files given directly
+    are written to the top of ``output_dir``.
+
+    :param paths: Nodal documents, or directories containing them.
+    :type paths: :class:`collections.Iterable`
+    :param output_dir: The directory to write SVG images into.
+    :type output_dir: :class:`basestring`
+    :param suffix: File extension of written images. Default=``'.svg'``
+    :type suffix: :class:`basestring`
+    :rtype: :class:`collections.Iterator`
+
+    .. versionadded:: 0.2.0
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if not filename.lower().endswith(NOD_EXTENSION):
+                        continue
+                    source = os.path.join(dirpath, filename)
+                    relative = os.path.relpath(source, path)
+                    destination = os.path.splitext(relative)[0] + suffix
+                    yield source, os.path.join(output_dir, destination)
+        else:
+            filename = os.path.basename(path)
+            destination = os.path.splitext(filename)[0] + suffix
+            yield path, os.path.join(output_dir, destination)
+
+
+def convert(job, instrument=False, cache_dir=None, cache_size=None,
+            **options):
+    """
+    Convert a single ``(source, destination)`` job, creating any missing
+    output directories.
+
+    Errors are captured and reported on the returned result rather than
+    raised, so one broken document never stops the rest of a batch.
+    Each process reuses a single :class:`~nod2svg.main.NodalImage`, with
+    every render option not given returned to its default.
+
+    When either ``cache_dir`` or ``cache_size`` is given, images are
+    copied from, and stored in, a :class:`~nod2svg.cache.RenderCache`.
+
+    :param job: Pair of Nodal document path & SVG image path.
+    :type job: :class:`tuple`
+    :param instrument: Record phase measurements. Default=``False``
+    :type instrument: :class:`bool`
+    :param cache_dir: Optional render cache directory.
+    :type cache_dir: :class:`basestring`
+    :param cache_size: Optional render cache size limit in bytes.
+    :type cache_size: :class:`numbers.Integral`
+    :param options: :attr:`~nod2svg.main.NodalImage.RENDER_OPTIONS` to
+                    render with.
+    :rtype: :class:`BatchResult`
+    :raises: :class:`TypeError` for unknown options.
+
+    .. versionadded:: 0.2.0
+    """
+    for name in options:
+        if name not in NodalImage.RENDER_OPTIONS:
+            raise TypeError('Unknown render option {0!r}'.format(name))
+    source, destination = job
+    image = _shared_image()
+    image.instrument = instrument
+    # Options of earlier jobs are kept by reset(), so set every one.
+    for name in NodalImage.RENDER_OPTIONS:
+        setattr(image, name, options.get(name, _defaults[name]))
+    cache = None
+    if cache_dir is not None or cache_size is not None:
+        cache = _shared_cache(cache_dir or default_directory(), cache_size)
+    cached = False
+    try:
+        directory = os.path.dirname(destination)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another worker may have created it first.
+                if not os.path.isdir(directory):
+                    raise
+        if cache is None:
+            image.load(source)
+            image.dump(destination)
+        else:
+            cached = cache.convert(image, source, destination)
+    except Exception as err:
+        message = '{0}: {1}'.format(type(err).__name__, err)
+        return BatchResult(source, destination, message, None, False,
+                           False)
+    finally:
+        stats = dict(image.stats) if instrument else None
+        image.reset()
+    return BatchResult(source, destination, None, stats, cached, False)
+
+
+def convert_batch(paths, output_dir, processes=None, suffix=SVG_EXTENSION,
+                  instrument=False, cache_dir=None, cache_size=None,
+                  incremental=False, **options):
+    """
+    Convert every Nodal document found in ``paths`` into ``output_dir``,
+    spreading the work over a :class:`multiprocessing.Pool`.
+
+    Results are yielded in completion order as each document finishes.
+    Images are compressed when ``suffix`` implies a codec, such as
+    ``'.svgz'``. See :func:`~nod2svg.writer.compression_for`.
+
+    :param paths: Nodal documents, or directories containing them.
+    :type paths: :class:`collections.Iterable`
+    :param output_dir: The directory to write SVG images into.
+    :type output_dir: :class:`basestring`
+    :param processes: Number of worker processes. Defaults to the number
+                      of CPUs. ``1`` converts in the calling process.
+    :type processes: :class:`numbers.Integral`
+    :param suffix: File extension of written images. Default=``'.svg'``
+    :type suffix: :class:`basestring`
+    :param instrument: Record phase measurements. Default=``False``
+    :type instrument: :class:`bool`
+    :param cache_dir: Optional render cache directory. See :func:`convert`.
+    :type cache_dir: :class:`basestring`
+    :param cache_size: Optional render cache size limit in bytes.
+    :type cache_size: :class:`numbers.Integral`
+    :param incremental: Skip images that are already up to date, keeping
+                        a :class:`Manifest` in ``output_dir``.
+                        Default=``False``
+    :type incremental: :class:`bool`
+    :param options: :attr:`~nod2svg.main.NodalImage.RENDER_OPTIONS` to
+                    render with.
+    :rtype: :class:`collections.Iterator` of :class:`BatchResult`
+
+    .. versionadded:: 0.2.0
+    """
+    jobs = iter_jobs(paths, output_dir, suffix)
+    task = functools.partial(convert, instrument=instrument,
+                             cache_dir=cache_dir, cache_size=cache_size,
+                             **options)
+    if not incremental:
+        for result in run_jobs(task, jobs, processes):
+            yield result
+        return
+    manifest = Manifest(os.path.join(output_dir, MANIFEST_NAME))
+    settings = Manifest.settings(suffix, options)
+    states = {}
+    stale = []
+    for source, destination in jobs:
+        try:
+            current, state = manifest.check(source, destination, settings)
+        except (IOError, OSError):
+            # Left for convert() to report.
+            current, state = False, None
+        if current:
+            manifest.record(destination, state)
+            yield BatchResult(source, destination, None, None, False, True)
+        else:
+            states[destination] = state
+            stale.append((source, destination))
+    try:
+        for result in run_jobs(task, stale, processes):
+            state = states[result.destination]
+            if result.error is None and state is not None:
+                manifest.record(result.destination, state)
+            else:
+                manifest.discard(result.destination)
+            yield result
+    finally:
+        manifest.save()
+
+
+def run_jobs(task, jobs, processes=None):
+    """
+    Call ``task`` with each of ``jobs``, spreading the calls over a
+    :class:`multiprocessing.Pool`. Results are yielded in completion
+    order.
+
+    :param task: Picklable function of one job.
+    :type task: :class:`collections.Callable`
+    :param jobs: Arguments of each call.
+    :type jobs: :class:`collections.Iterable`
+    :param processes: Number of worker processes. Defaults to the number
+                      of CPUs. ``1`` calls ``task`` in the calling process.
+    :type processes: :class:`numbers.Integral`
+    :rtype: :class:`collections.Iterator`
+
+    .. versionadded:: 0.2.0
+    """
+    if processes == 1:
+        for job in jobs:
+            yield task(job)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(task, jobs, chunksize=8):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
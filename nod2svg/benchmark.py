@@ -0,0 +1,336 @@
+""":mod:`nod2svg.benchmark` --- Synthetic documents & benchmarks
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Builds synthetic Nodal documents of any size & shape, and times each phase
+of converting them. Results are written as JSON so runs can be compared
+between versions::
+
+    $ python -m nod2svg.benchmark --nodes 20000 --output after.json \\
+                                  --compare before.json
+
+.. versionadded:: 0.2.0
+"""
+import argparse
+import json
+import os
+import platform
+import plistlib
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .constants import *
+from .main import NodalImage, VERSION, scale_factor
+
+__all__ = ('benchmark',
+           'compare',
+           'synthesize',
+           'write_document')
+
+#: Default relative weights of Edge path types.
+PATH_MIX = ((DIRECT, 1), (CITYBLOCK, 1), (CITYBLOCKFLIPPED, 1))
+#: Default relative weights of Node signalling methods.
+SIGNALLING_MIX = (('Sequential', 2), ('Parallel', 1), ('Random', 1))
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+
+def _weighted(rng, mix):
+    total = sum(weight for _, weight in mix)
+    pick = rng.uniform(0, total)
+    for value, weight in mix:
+        pick -= weight
+        if pick <= 0:
+            return value
+    return mix[-1][0]
+
+
+def synthesize(nodes=1000, edge_density=1.5, text_boxes=10, wormholes=0.05,
+               path_mix=PATH_MIX, signalling_mix=SIGNALLING_MIX, seed=0):
+    """
+    Build a synthetic Nodal document.
+
+    Nodes are scattered over a square grid of :const:`GRID_TICK` cells
+    sized to the Node count, and Edges join random pairs of Nodes.
+
+    :param nodes: Number of Nodes.
+    :type nodes: :class:`numbers.Integral`
+    :param edge_density: Average number of Edges leaving each Node.
+    :type edge_density: :class:`numbers.Real`
+    :param text_boxes: Number of text boxes.
+    :type text_boxes: :class:`numbers.Integral`
+    :param wormholes: Fraction of Edges flagged as wormholes.
+    :type wormholes: :class:`numbers.Real`
+    :param path_mix: ``(path, weight)`` pairs choosing Edge path types.
+    :type path_mix: :class:`collections.Sequence`
+    :param signalling_mix: ``(method, weight)`` pairs choosing Node
+                           signalling methods.
+    :type signalling_mix: :class:`collections.Sequence`
+    :param seed: Random seed, so documents are reproducible.
+    :type seed: :class:`numbers.Integral`
+    :returns: Nodal document, ready for :mod:`plistlib`.
+    :rtype: :class:`dict`
+
+    .. versionadded:: 0.2.0
+    """
+    rng = random.Random(seed)
+    side = max(2, int((nodes * 4) ** 0.5))
+    elements = {}
+
+    def tick_position():
+        x = rng.randrange(-side // 2, side // 2) * GRID_TICK
+        y = rng.randrange(-side // 2, side // 2) * GRID_TICK
+        return '{{{0}, {1}}}'.format(x, y)
+
+    for _ in range(nodes):
+        elements[str(len(elements) + 1)] = {
+            TYPE: NODE,
+            TICKPOS: tick_position(),
+            SIGNALLING_METHOD: _weighted(rng, signalling_mix),
+            DONT_PLAY_NOTE: rng.random() < 0.05}
+    for _ in range(int(nodes * edge_density) if nodes else 0):
+        elements[str(len(elements) + 1)] = {
+            TYPE: EDGE,
+            FROM_NODE: rng.randint(1, nodes),
+            TO_NODE: rng.randint(1, nodes),
+            PATH: _weighted(rng, path_mix),
+            WORMHOLE: rng.random() < wormholes}
+    for index in range(text_boxes):
+        elements[str(len(elements) + 1)] = {
+            TYPE: TEXTBOX,
+            TICKPOS: tick_position(),
+            TEXT: '<div><p>Annotation {0}</p></div>'.format(index)}
+    return {ELEMENTS: elements,
+            AUTHOR: 'nod2svg.benchmark',
+            TITLE: 'Synthetic matrix of {0} nodes'.format(nodes),
+            STYLE_BACKGROUND_COLOR: '#202020ff',
+            STYLE_ANNOTATION_COLOR: '#ffffff80'}
+
+
+def write_document(path, **shape):
+    """
+    Write a synthetic Nodal document to ``path``.
+
+    :param path: The system path to write to.
+    :type path: :class:`basestring`
+    :param shape: Keyword arguments for :func:`synthesize`.
+
+    .. versionadded:: 0.2.0
+    """
+    document = synthesize(**shape)
+    with open(path, 'wb') as fd:
+        if hasattr(plistlib, 'dump'):
+            plistlib.dump(document, fd)
+        else:
+            plistlib.writePlist(document, fd)
+
+
+def _measure(setup, phase, repeat):
+    """Return best wall time & peak traced memory of ``phase``."""
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        started = timer()
+        phase(state)
+        elapsed = timer() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    # Tracing slows everything down, so peak memory is a separate run.
+    state = setup()
+    tracemalloc.start()
+    try:
+        result = phase(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def benchmark(path, repeat=3, **options):
+    """
+    Time each phase of converting the Nodal document at ``path``.
+
+    Every phase reports the best wall time of ``repeat`` runs in seconds,
+    the peak memory allocated while running it in bytes, and where
+    relevant the number of bytes output.
+
+    :param path: The path to a Nodal document.
+    :type path: :class:`basestring`
+    :param repeat: Number of timed runs of each phase.
+    :type repeat: :class:`numbers.Integral`
+    :param options: :attr:`~nod2svg.main.NodalImage.RENDER_OPTIONS` to
+                    render with.
+    :rtype: :class:`dict`
+
+    .. versionadded:: 0.2.0
+    """
+    from .main import ET
+    loaded = NodalImage(path, **options)
+    scratch = tempfile.mkdtemp(prefix='nod2svg-benchmark-')
+
+    def fresh():
+        loaded.invalidate()
+        return loaded
+
+    def fresh_indexes():
+        loaded.indexes = {}
+        return loaded
+
+    def root():
+        return ET.Element('svg')
+
+    def dump(image):
+        target = os.path.join(scratch, 'out.svg')
+        image.dump(target)
+        return os.path.getsize(target)
+
+    phases = (('load', lambda: None,
+               lambda _: NodalImage(path, **options)),
+              ('lookup', fresh_indexes,
+               lambda image: image.lookup(PATH, DIRECT)),
+              ('generate_text_boxes', root, loaded.generate_text_boxes),
+              ('generate_edges', root, loaded.generate_edges),
+              ('generate_nodes', root, loaded.generate_nodes),
+              ('generate', fresh, lambda image: image.build()),
+              ('dumps', fresh, lambda image: len(image.dumps())),
+              ('dump', fresh, dump))
+    results = {}
+    try:
+        for name, setup, phase in phases:
+            seconds, peak, result = _measure(setup, phase, repeat)
+            results[name] = {'seconds': seconds, 'peak_memory': peak}
+            if name in ('dumps', 'dump'):
+                results[name]['output_bytes'] = result
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {'version': VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'document': {'path': path,
+                         'bytes': os.path.getsize(path),
+                         'nodes': len(loaded.nodes),
+                         'edges': len(loaded.edges),
+                         'text_boxes': len(loaded.textboxes)},
+            'options': loaded.render_options(),
+            'phases': results}
+
+
+def compare(before, after):
+    """
+    Relative change of each phase between two :func:`benchmark` results.
+
+    :returns: Mapping of phase to ``after / before`` ratios of each
+              measurement. Below ``1.0`` is an improvement.
+    :rtype: :class:`dict`
+
+    .. versionadded:: 0.2.0
+    """
+    ratios = {}
+    for name, measured in after['phases'].items():
+        if name not in before['phases']:
+            continue
+        previous = before['phases'][name]
+        ratios[name] = dict((key, measured[key] / float(previous[key]))
+                            for key in measured
+                            if previous.get(key))
+    return ratios
+
+
+def _mix(text, names):
+    """Parse ``name=weight,...`` into ``(value, weight)`` pairs."""
+    mix = []
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        mix.append((names.get(name, name), float(weight or 1)))
+    return tuple(mix)
+
+
+def main(argv=None):
+    """
+    Entry point for ``python -m nod2svg.benchmark``.
+
+    .. versionadded:: 0.2.0
+    """
+    parser = argparse.ArgumentParser(prog='python -m nod2svg.benchmark')
+    parser.add_argument('document', nargs='?',
+                        help='benchmark an existing .nod document instead '
+                             'of a synthetic one')
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--edge-density', type=float, default=1.5,
+                        help='average edges leaving each node')
+    parser.add_argument('--text-boxes', type=int, default=10)
+    parser.add_argument('--wormholes', type=float, default=0.05,
+                        help='fraction of edges that are wormholes')
+    parser.add_argument('--paths', default='direct=1,cityblock=1,flipped=1',
+                        help='path type weights')
+    parser.add_argument('--signalling',
+                        default='Sequential=2,Parallel=1,Random=1',
+                        help='signalling method weights')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stylesheet', action='store_true')
+    parser.add_argument('--interaction', choices=INTERACTIONS)
+    parser.add_argument('--scale', type=scale_factor, metavar='FACTOR')
+    parser.add_argument('--precision', type=int, metavar='N')
+    parser.add_argument('--output', metavar='JSON',
+                        help='write results to JSON file')
+    parser.add_argument('--compare', metavar='JSON',
+                        help='report ratios against earlier results')
+    args = parser.parse_args(argv)
+    options = {}
+    if args.stylesheet:
+        options['stylesheet'] = True
+    if args.interaction:
+        options['interaction'] = args.interaction
+    for name in ('scale', 'precision'):
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    scratch = None
+    path = args.document
+    if path is None:
+        scratch = tempfile.mkdtemp(prefix='nod2svg-benchmark-')
+        path = os.path.join(scratch, 'synthetic.nod')
+        paths = {'direct': DIRECT,
+                 'cityblock': CITYBLOCK,
+                 'flipped': CITYBLOCKFLIPPED}
+        write_document(path,
+                       nodes=args.nodes,
+                       edge_density=args.edge_density,
+                       text_boxes=args.text_boxes,
+                       wormholes=args.wormholes,
+                       path_mix=_mix(args.paths, paths),
+                       signalling_mix=_mix(args.signalling, {}),
+                       seed=args.seed)
+    try:
+        results = benchmark(path, repeat=args.repeat, **options)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    if args.document is None:
+        results['document']['path'] = None
+        results['document']['shape'] = {'nodes': args.nodes,
+                                        'edge_density': args.edge_density,
+                                        'text_boxes': args.text_boxes,
+                                        'wormholes': args.wormholes,
+                                        'paths': args.paths,
+                                        'signalling': args.signalling,
+                                        'seed': args.seed}
+    if args.compare:
+        with open(args.compare) as fd:
+            results['compare'] = compare(json.load(fd), results)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as fd:
+            fd.write(text + '\n')
+    sys.stdout.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
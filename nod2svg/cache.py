@@ -0,0 +1,268 @@
+""":mod:`nod2svg.cache` --- Content-addressed render cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Keeps rendered images on disk, keyed by a hash of the Nodal document's
+bytes, the nod2svg version & render revision, and every render option.
+Converting an unchanged document again copies the cached image without
+parsing it::
+
+    from nod2svg.cache import RenderCache
+    from nod2svg.main import NodalImage
+
+    cache = RenderCache(max_size=512 * 1024 * 1024)
+    cache.convert(NodalImage(), path_to_nod, path_to_svg)
+
+Least recently used images are evicted once the cache outgrows
+``max_size``.
+
+.. versionadded:: 0.2.0
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from .constants import COMPRESSION_NONE
+from .main import RENDER_REVISION, VERSION
+from .writer import compression_for
+
+__all__ = ('RenderCache',
+           'default_directory',
+           'hash_file')
+
+# Size of blocks read while hashing documents.
+BLOCK_SIZE = 1 << 16
+# Eviction frees space down to this fraction of the size limit, so that
+# not every following store has to evict again.
+LOW_WATER = 0.9
+
+replace = getattr(os, 'replace', os.rename)
+
+
+def default_directory():
+    """
+    The cache directory used when none is given. ``nod2svg`` inside
+    ``$XDG_CACHE_HOME``, or else ``~/.cache``.
+
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'nod2svg')
+
+
+def hash_file(path, digest=None):
+    """
+    Hash the contents of the file at ``path``.
+
+    :param path: The file to read.
+    :type path: :class:`basestring`
+    :param digest: Optional :mod:`hashlib` object to update. Defaults to a
+                   new SHA-256 digest.
+    :returns: The hexadecimal digest.
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    if digest is None:
+        digest = hashlib.sha256()
+    with open(path, 'rb') as fd:
+        for block in iter(lambda: fd.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RenderCache(object):
+    """
+    On-disk cache of rendered images.
+
+    Safe to share between processes: entries are written to a temporary
+    file and renamed into place, and entries vanishing while being read
+    are treated as misses.
+
+    :param directory: Where cached images are kept. Defaults to
+                      :func:`default_directory`.
+    :type directory: :class:`basestring`
+    :param max_size: Optional size limit of the cache in bytes.
+    :type max_size: :class:`numbers.Integral`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+        # Total size of entries, counted on first store.
+        self._size = None
+
+    def key(self, source, options, compression=COMPRESSION_NONE):
+        """
+        Hash the Nodal document at ``source`` with everything else that
+        affects the rendered image.
+
+        :param source: The path to a Nodal document.
+        :type source: :class:`basestring`
+        :param options: Render options, as from
+                        :meth:`~nod2svg.main.NodalImage.render_options`.
+        :type options: :class:`dict`
+        :param compression: One of
+                            :const:`~nod2svg.constants.COMPRESSIONS`.
+        :type compression: :class:`basestring`
+        :rtype: :class:`basestring`
+        """
+        digest = hashlib.sha256()
+        settings = json.dumps([VERSION, RENDER_REVISION, options,
+                               compression], sort_keys=True)
+        digest.update(settings.encode('utf-8'))
+        return hash_file(source, digest)
+
+    def path(self, key):
+        """
+        Where the image cached under ``key`` is kept.
+
+        :rtype: :class:`basestring`
+        """
+        return os.path.join(self.directory, key[:2], key)
+
+    def fetch(self, key, destination):
+        """
+        Copy the image cached under ``key`` to ``destination``.
+
+        :returns: ``True`` when found, or ``False`` on a miss.
+        :rtype: :class:`bool`
+        """
+        path = self.path(key)
+        try:
+            shutil.copyfile(path, destination)
+            # Mark as recently used.
+            os.utime(path, None)
+        except (IOError, OSError):
+            if not os.path.exists(path):
+                return False
+            raise
+        return True
+
+    def store(self, key, source):
+        """
+        Copy the rendered image at ``source`` into the cache as ``key``,
+        evicting old entries if the cache grows too large.
+        """
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another process may have created it first.
+                if not os.path.isdir(directory):
+                    raise
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as target:
+                with open(source, 'rb') as image:
+                    shutil.copyfileobj(image, target)
+            replace(temporary, path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+        if self.max_size is not None:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self.entries())
+            else:
+                self._size += os.path.getsize(path)
+            if self._size > self.max_size:
+                self.evict()
+
+    def entries(self):
+        """
+        List every cached image.
+
+        :returns: ``(path, size, last_used)`` tuples.
+        :rtype: :class:`list`
+        """
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for shard in os.listdir(self.directory):
+            directory = os.path.join(self.directory, shard)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue
+                found.append((path, status.st_size, status.st_mtime))
+        return found
+
+    def evict(self, max_size=None):
+        """
+        Remove least recently used images until the cache is below
+        ``max_size`` bytes. By default, frees space down to a fraction of
+        :attr:`max_size`.
+
+        :returns: Number of images removed.
+        :rtype: :class:`numbers.Integral`
+        """
+        if max_size is None:
+            if self.max_size is None:
+                return 0
+            max_size = int(self.max_size * LOW_WATER)
+        entries = self.entries()
+        entries.sort(key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        for path, entry_size, _ in entries:
+            if size <= max_size:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                # Already evicted by another process.
+                pass
+            size -= entry_size
+        self._size = size
+        return removed
+
+    def clear(self):
+        """Remove every cached image."""
+        self.evict(0)
+
+    def convert(self, image, source, destination, compression=None):
+        """
+        Write the image of the Nodal document at ``source`` to
+        ``destination``, copying it from the cache when possible.
+
+        On a miss, the document is loaded into ``image``, dumped, and
+        stored for next time.
+
+        :param image: Rendered with its current render options.
+        :type image: :class:`~nod2svg.main.NodalImage`
+        :param source: The path to a Nodal document.
+        :type source: :class:`basestring`
+        :param destination: The system path to write an SVG to.
+        :type destination: :class:`basestring`
+        :param compression: As for :meth:`~nod2svg.main.NodalImage.dump`.
+        :type compression: :class:`basestring`
+        :returns: ``True`` when copied from the cache.
+        :rtype: :class:`bool`
+        """
+        if compression is None:
+            compression = compression_for(destination)
+        key = self.key(source, image.render_options(), compression)
+        if self.fetch(key, destination):
+            return True
+        image.load(source)
+        image.dump(destination, compression=compression)
+        self.store(key, destination)
+        return False
@@ -3,11 +3,21 @@
 """
 NODE = 'Node'
 NOTE = 'Note'
+ANNOTATIONS_INLINE = 'inline'
+ANNOTATIONS_NONE = 'none'
+ANNOTATIONS_PARSE = 'parse'
+ANNOTATIONS = (ANNOTATIONS_PARSE, ANNOTATIONS_INLINE, ANNOTATIONS_NONE)
 AUTHOR = 'Author'
 CITYBLOCK = 'CityBlock'
 CITYBLOCKFLIPPED = CITYBLOCK + 'Flipped'
 COLOR = 'Color'
 COMMENT = 'Comment'
+COMPRESSION_BZIP2 = 'bz2'
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_NONE = 'none'
+COMPRESSION_XZ = 'xz'
+COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_GZIP,
+                COMPRESSION_BZIP2, COMPRESSION_XZ)
 DIRECT = 'Direct'
 DOM_ID = 'DOM_ID'
 DONT_PLAY_NOTE = 'DontPlay' + NOTE
@@ -19,10 +29,18 @@ ELEMENTS = 'Elements'
 EDGE_OUTS = 'EDGE_OUTS'
 FROM_NODE = 'From' + NODE
 ID_FORMAT = 'nod{0}_{1}'
+INTERACTION_SCRIPT = 'script'
+INTERACTION_SMIL = 'smil'
+INTERACTION_STATIC = 'static'
+INTERACTIONS = (INTERACTION_SMIL, INTERACTION_SCRIPT, INTERACTION_STATIC)
+NOD_EXTENSION = '.nod'
 PATH = 'Path'
+SIGNALLING_METHOD = 'SignallingMethod'
 STYLE = 'Style'
 STYLE_ANNOTATION_COLOR = STYLE + 'Annotation' + COLOR
 STYLE_BACKGROUND_COLOR = STYLE + 'Background' + COLOR
+SVG_EXTENSION = '.svg'
+SVGZ_EXTENSION = '.svgz'
 TEXT = 'Text'
 TEXTBOX = TEXT + 'Box'
 TICKPOS = 'TickPos'
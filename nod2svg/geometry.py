@@ -0,0 +1,372 @@
+""":mod:`nod2svg.geometry` --- Edge path geometry
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Computes the SVG path of Edges between Nodes, one at a time or in batches.
+
+A path is described as a segment tuple ``(shape, x, y, a, b)``, starting at
+``(x, y)`` and continuing by ``shape``:
+
+- :const:`LINE` --- a line to ``(a, b)``.
+- :const:`VERTICAL` --- a vertical line to ``y = a``.
+- :const:`HORIZONTAL` --- a horizontal line to ``x = a``.
+- :const:`CITY_BLOCK` --- a horizontal line to ``x = a``, then a vertical
+  line to ``y = b``.
+- :const:`CITY_BLOCK_FLIPPED` --- a vertical line to ``y = a``, then a
+  horizontal line to ``x = b``.
+
+Segments are written as absolute path data by :func:`format_path`, or
+rescaled, rounded & relative by :func:`format_compact_path`.
+
+When NumPy_ is installed, :func:`segments` can compute whole batches with
+array arithmetic. Otherwise it falls back to the scalar functions. Both
+produce exactly the same values, and so the same path strings.
+
+Every segment ends up as a Python tuple to be formatted, and building those
+from arrays costs about as much as the scalar arithmetic it replaces. So
+array arithmetic is opt-in, through :data:`VECTORIZE` or the ``vectorize``
+argument of :func:`segments`.
+
+.. _NumPy: http://www.numpy.org/
+
+.. versionadded:: 0.2.0
+"""
+import math
+
+from .constants import CITYBLOCK, CITYBLOCKFLIPPED, DIRECT
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ('CITY_BLOCK',
+           'CITY_BLOCK_FLIPPED',
+           'HORIZONTAL',
+           'LINE',
+           'VERTICAL',
+           'city_block',
+           'city_block_flipped',
+           'direct',
+           'format_compact_path',
+           'format_number',
+           'format_path',
+           'horizontal',
+           'segments',
+           'vertical')
+
+LINE = 'L'
+VERTICAL = 'V'
+HORIZONTAL = 'H'
+CITY_BLOCK = 'HV'
+CITY_BLOCK_FLIPPED = 'VH'
+
+#: Distance from a Node's center to where an Edge leaves it.
+START_OFFSET = 64000
+#: Distance from a Node's center to where an Edge's arrow head ends.
+END_OFFSET = 70400
+#: Compute batches with NumPy by default, when it is installed.
+VECTORIZE = False
+#: Smallest batch worth the overhead of building arrays.
+VECTOR_THRESHOLD = 64
+
+#: Decimal places kept by compact output, unless told otherwise.
+DEFAULT_PRECISION = 3
+
+PATH_FORMATS = {LINE: 'M {0} {1} L {2} {3}',
+                VERTICAL: 'M {0} {1} V {2}',
+                HORIZONTAL: 'M {0} {1} H {2}',
+                CITY_BLOCK: 'M {0} {1} H {2} V {3}',
+                CITY_BLOCK_FLIPPED: 'M {0} {1} V {2} H {3}'}
+
+
+def vertical(sx, sy, ex, ey):
+    """
+    Vertical segment between two points sharing an X coordinate.
+
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    if sy > ey:
+        start_y = sy - START_OFFSET
+    else:
+        start_y = sy + START_OFFSET
+    if ey > sy:
+        end_y = ey - END_OFFSET
+    else:
+        end_y = ey + END_OFFSET
+    return VERTICAL, sx, start_y, end_y, None
+
+
+def horizontal(sx, sy, ex, ey):
+    """
+    Horizontal segment between two points sharing a Y coordinate.
+
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    if sx > ex:
+        start_x = sx - START_OFFSET
+    else:
+        start_x = sx + START_OFFSET
+    if ex > sx:
+        end_x = ex - END_OFFSET
+    else:
+        end_x = ex + END_OFFSET
+    return HORIZONTAL, start_x, sy, end_x, None
+
+
+def city_block(sx, sy, ex, ey):
+    """
+    City block segment, moving horizontally then vertically.
+
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    if sx == ex:
+        return vertical(sx, sy, ex, ey)
+    elif sy == ey:
+        return horizontal(sx, sy, ex, ey)
+    if ey > sy:
+        end_y = ey - END_OFFSET
+    else:
+        end_y = ey + END_OFFSET
+    if sx > ex:
+        start_x = sx - START_OFFSET
+    else:
+        start_x = sx + START_OFFSET
+    return CITY_BLOCK, start_x, sy, ex, end_y
+
+
+def city_block_flipped(sx, sy, ex, ey):
+    """
+    Inverted city block segment, moving vertically then horizontally.
+
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    if sx == ex:
+        return vertical(sx, sy, ex, ey)
+    elif sy == ey:
+        return horizontal(sx, sy, ex, ey)
+    if sy > ey:
+        start_y = sy - START_OFFSET
+    else:
+        start_y = sy + START_OFFSET
+    if ex > sx:
+        end_x = ex - END_OFFSET
+    else:
+        end_x = ex + END_OFFSET
+    return CITY_BLOCK_FLIPPED, sx, start_y, ey, end_x
+
+
+def direct(sx, sy, ex, ey):
+    """
+    Straight-line segment between two points.
+
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    dy = ey - sy
+    dx = ex - sx
+    theta = math.atan2(-dy, -dx)
+    theta %= 2 * math.pi
+    theta_cos = math.cos(theta)
+    theta_sin = math.sin(theta)
+    end_x = ex + END_OFFSET * theta_cos
+    end_y = ey + END_OFFSET * theta_sin
+    start_x = sx - START_OFFSET * theta_cos
+    start_y = sy - START_OFFSET * theta_sin
+    return LINE, start_x, start_y, end_x, end_y
+
+
+SCALAR = {DIRECT: direct,
+          CITYBLOCK: city_block,
+          CITYBLOCKFLIPPED: city_block_flipped}
+
+
+def format_path(segment):
+    """
+    Format a segment tuple as SVG path data.
+
+    :param segment: Segment tuple, as described above.
+    :type segment: :class:`tuple`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    return PATH_FORMATS[segment[0]].format(*segment[1:])
+
+
+def format_number(value, precision):
+    """
+    Format ``value`` rounded to ``precision`` decimal places, in as few
+    characters as possible.
+
+    Trailing zeros and leading integer zeros are dropped, so ``0.500``
+    becomes ``.5``, and ``-0.0`` becomes ``0``.
+
+    :param value: The number to format.
+    :type value: :class:`numbers.Real`
+    :param precision: Decimal places to keep.
+    :type precision: :class:`numbers.Integral`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    text = '{0:.{1}f}'.format(value, precision)
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    elif text == '-0':
+        text = '0'
+    return text
+
+
+def _join_numbers(numbers):
+    """Join formatted numbers, only separating them where needed."""
+    parts = [numbers[0]]
+    for previous, number in zip(numbers, numbers[1:]):
+        if not (number.startswith('-') or
+                (number.startswith('.') and '.' in previous)):
+            parts.append(' ')
+        parts.append(number)
+    return ''.join(parts)
+
+
+def format_compact_path(segment, scale=1, precision=DEFAULT_PRECISION):
+    """
+    Format a segment tuple as short SVG path data.
+
+    Coordinates are divided by ``scale`` and rounded to ``precision``
+    decimal places. Only the starting point is absolute, and everything
+    after it is relative. Offsets are measured between rounded points,
+    so rounding errors never accumulate along the path.
+
+    :param segment: Segment tuple, as described above.
+    :type segment: :class:`tuple`
+    :param scale: Units of the source coordinates per output unit.
+    :type scale: :class:`numbers.Real`
+    :param precision: Decimal places to keep.
+    :type precision: :class:`numbers.Integral`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    shape = segment[0]
+    scale = float(scale)
+    x, y, a, b = [None if value is None else round(value / scale, precision)
+                  for value in segment[1:]]
+    start = 'M' + _join_numbers([format_number(x, precision),
+                                 format_number(y, precision)])
+    if shape == LINE:
+        return start + 'l' + _join_numbers([format_number(a - x, precision),
+                                            format_number(b - y, precision)])
+    elif shape == VERTICAL:
+        return start + 'v' + format_number(a - y, precision)
+    elif shape == HORIZONTAL:
+        return start + 'h' + format_number(a - x, precision)
+    elif shape == CITY_BLOCK:
+        return ''.join((start,
+                        'h', format_number(a - x, precision),
+                        'v', format_number(b - y, precision)))
+    return ''.join((start,
+                    'v', format_number(a - y, precision),
+                    'h', format_number(b - x, precision)))
+
+
+def segments(paths, points, vectorize=None):
+    """
+    Compute the segments of many Edges at once.
+
+    :param paths: Nodal path type of each Edge. One of
+                  :const:`~nod2svg.constants.DIRECT`,
+                  :const:`~nod2svg.constants.CITYBLOCK`, or
+                  :const:`~nod2svg.constants.CITYBLOCKFLIPPED`.
+    :type paths: :class:`collections.Sequence`
+    :param points: ``(sx, sy, ex, ey)`` coordinates of each Edge.
+    :type points: :class:`collections.Sequence`
+    :param vectorize: Force (``True``) or prevent (``False``) use of NumPy.
+                      By default NumPy is used when :data:`VECTORIZE` is
+                      set, it is installed, and the batch is large enough.
+    :type vectorize: :class:`bool`
+    :returns: One segment tuple per Edge, in order.
+    :rtype: :class:`list`
+
+    .. versionadded:: 0.2.0
+    """
+    if vectorize is None:
+        vectorize = (VECTORIZE and numpy is not None and
+                     len(points) >= VECTOR_THRESHOLD)
+    if not vectorize:
+        return [SCALAR[path](*point) for path, point in zip(paths, points)]
+    if numpy is None:
+        raise ImportError('NumPy is required to vectorize geometry')
+    return _vector_segments(paths, points)
+
+
+def _vector_segments(paths, points):
+    result = [None] * len(points)
+    if not points:
+        return result
+    xy = numpy.array(points, dtype=numpy.int64)
+    sx, sy, ex, ey = xy[:, 0], xy[:, 1], xy[:, 2], xy[:, 3]
+    kinds = numpy.array(paths, dtype=object)
+    is_direct = kinds == DIRECT
+    is_city = kinds == CITYBLOCK
+    is_flipped = kinds == CITYBLOCKFLIPPED
+    # Straight & city block paths between aligned Nodes.
+    is_vertical = (is_city | is_flipped) & (sx == ex)
+    is_horizontal = (is_city | is_flipped) & ~is_vertical & (sy == ey)
+    is_city &= ~(is_vertical | is_horizontal)
+    is_flipped &= ~(is_vertical | is_horizontal)
+
+    # Start & end offsets of every axis, whether used or not.
+    start_x = numpy.where(sx > ex, sx - START_OFFSET, sx + START_OFFSET)
+    start_y = numpy.where(sy > ey, sy - START_OFFSET, sy + START_OFFSET)
+    end_x = numpy.where(ex > sx, ex - END_OFFSET, ex + END_OFFSET)
+    end_y = numpy.where(ey > sy, ey - END_OFFSET, ey + END_OFFSET)
+
+    def fill(index, shape, *columns):
+        """Store segments for Edges at ``index``, from matching columns."""
+        values = [column.tolist() for column in columns]
+        if len(values) == 3:
+            values.append([None] * len(index))
+        for i, x, y, a, b in zip(index.tolist(), *values):
+            result[i] = (shape, x, y, a, b)
+
+    for mask, shape, columns in ((is_vertical, VERTICAL,
+                                  (sx, start_y, end_y)),
+                                 (is_horizontal, HORIZONTAL,
+                                  (start_x, sy, end_x)),
+                                 (is_city, CITY_BLOCK,
+                                  (start_x, sy, ex, end_y)),
+                                 (is_flipped, CITY_BLOCK_FLIPPED,
+                                  (sx, start_y, ey, end_x))):
+        index = numpy.flatnonzero(mask)
+        if len(index):
+            fill(index, shape, *[column[index] for column in columns])
+
+    index = numpy.flatnonzero(is_direct)
+    if len(index):
+        dx = (ex[index] - sx[index]).tolist()
+        dy = (ey[index] - sy[index]).tolist()
+        # Trigonometry stays in :mod:`math`; NumPy's vectorized functions
+        # may differ from it in the last bit, changing the path strings.
+        tau = 2 * math.pi
+        theta = [math.atan2(-y, -x) % tau for x, y in zip(dx, dy)]
+        theta_cos = numpy.array([math.cos(t) for t in theta])
+        theta_sin = numpy.array([math.sin(t) for t in theta])
+        fill(index, LINE,
+             sx[index] - START_OFFSET * theta_cos,
+             sy[index] - START_OFFSET * theta_sin,
+             ex[index] + END_OFFSET * theta_cos,
+             ey[index] + END_OFFSET * theta_sin)
+    return result
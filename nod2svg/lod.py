@@ -0,0 +1,125 @@
+""":mod:`nod2svg.lod` --- Levels of detail
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Summarizes a document for overview images, where single Nodes are smaller
+than a pixel. Nodes are clustered by grid cell, and the Edges between two
+cells are merged into one link::
+
+    from nod2svg.lod import Level
+
+    level = Level.build(image.nodes, image.edges, cell_size)
+    coarser = level.coarsen(4)
+
+Building a level visits every element once, while coarsening an existing
+level only visits its clusters & links.
+
+.. versionadded:: 0.2.0
+"""
+from . import geometry
+
+__all__ = ('Level',)
+
+
+class Level(object):
+    """
+    Nodes clustered into square cells, and Edges merged between them.
+
+    :param cell_size: Width & height of cells, in document units.
+    :type cell_size: :class:`numbers.Integral`
+    :param clusters: Map of ``(column, row)`` cells to
+                     ``[sum_x, sum_y, count]`` of their Nodes.
+    :type clusters: :class:`dict`
+    :param links: Map of ``(cell, cell)`` pairs, in sorted order, to the
+                  number of Edges between them either way.
+    :type links: :class:`dict`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, cell_size, clusters, links):
+        self.cell_size = cell_size
+        self.clusters = clusters
+        self.links = links
+
+    @classmethod
+    def build(cls, nodes, edges, cell_size):
+        """
+        Cluster Node & Edge records.
+
+        Edges within one cell, and Edges whose paths aren't drawn, are left
+        out.
+
+        :param nodes: :class:`~nod2svg.records.Node` records by key.
+        :type nodes: :class:`dict`
+        :param edges: :class:`~nod2svg.records.Edge` records.
+        :type edges: :class:`dict`
+        :param cell_size: Width & height of cells, in document units.
+        :type cell_size: :class:`numbers.Integral`
+        :rtype: :class:`Level`
+        """
+        clusters = {}
+        cells = {}
+        for k, v in nodes.items():
+            if v.x is None:
+                continue
+            cell = (v.x // cell_size, v.y // cell_size)
+            cells[k] = cell
+            cluster = clusters.get(cell)
+            if cluster is None:
+                clusters[cell] = [v.x, v.y, 1]
+            else:
+                cluster[0] += v.x
+                cluster[1] += v.y
+                cluster[2] += 1
+        links = {}
+        for v in edges.values():
+            if v.path not in geometry.SCALAR:
+                continue
+            a = cells.get('{0}'.format(v.from_node))
+            b = cells.get('{0}'.format(v.to_node))
+            if a is None or b is None or a == b:
+                continue
+            pair = (a, b) if a < b else (b, a)
+            links[pair] = links.get(pair, 0) + 1
+        return cls(cell_size, clusters, links)
+
+    def coarsen(self, factor):
+        """
+        Merge every ``factor`` by ``factor`` block of cells.
+
+        :param factor: Number of cells merged across & down.
+        :type factor: :class:`numbers.Integral`
+        :rtype: :class:`Level`
+        """
+        clusters = {}
+        for (column, row), (x, y, count) in self.clusters.items():
+            cell = (column // factor, row // factor)
+            cluster = clusters.get(cell)
+            if cluster is None:
+                clusters[cell] = [x, y, count]
+            else:
+                cluster[0] += x
+                cluster[1] += y
+                cluster[2] += count
+        links = {}
+        for (a, b), count in self.links.items():
+            a = (a[0] // factor, a[1] // factor)
+            b = (b[0] // factor, b[1] // factor)
+            if a == b:
+                continue
+            pair = (a, b) if a < b else (b, a)
+            links[pair] = links.get(pair, 0) + count
+        return Level(self.cell_size * factor, clusters, links)
+
+    def centers(self):
+        """
+        The mean position of each cluster's Nodes, rounded to document
+        units.
+
+        :returns: Map of cells to ``(x, y, count)``.
+        :rtype: :class:`dict`
+        """
+        return dict((cell, (int(round(x / float(count))),
+                            int(round(y / float(count))),
+                            count))
+                    for cell, (x, y, count) in self.clusters.items())
@@ -0,0 +1,80 @@
+""":mod:`nod2svg.lru` --- Least recently used cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+A bounded, thread-safe mapping shared by the render service's document &
+image caches, and by the text box markup cache::
+
+    from nod2svg.lru import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.get('a')  # 1
+
+.. versionadded:: 0.2.0
+"""
+import collections
+import threading
+
+__all__ = ('LRUCache',)
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping holding at most ``maxsize`` items, discarding the
+    least recently used first.
+
+    :param maxsize: Number of items kept.
+    :type maxsize: :class:`numbers.Integral`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Return the item for ``key``, and mark it recently used."""
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """Return the item for ``key``, without counting a hit or miss."""
+        with self._lock:
+            return self._items.get(key, default)
+
+    def put(self, key, value):
+        """Store ``value`` for ``key``, evicting the oldest items."""
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def status(self):
+        """
+        Size & hit rate counters.
+
+        :rtype: :class:`dict`
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / float(lookups) if lookups else None
+            return {'size': len(self._items),
+                    'maxsize': self.maxsize,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': hit_rate}
@@ -6,18 +6,159 @@ Opens Nodal document and builds a SVG image::
     NodalImage(path_to_nod).dump(path_to_svg)
 
 """
-import math
-import plistlib
-import xml.etree.cElementTree as ET
-
+import errno
+import heapq
+import io
+import json
+import numbers
+import os
+import random
+import time
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from . import geometry
 from .constants import *
+from .geometry import (DEFAULT_PRECISION, LINE, format_compact_path,
+                       format_number, format_path)
+from .parser import ELEMENT_FIELDS, parse as parse_document
+from .lod import Level
+from .markup import XHTML_NAMESPACE, Markup, markup_cache
+from .records import record
+from .spatial import GridIndex, crosses, intersects
+from .writer import (StreamWriter, TreeWriter, compress, compression_for,
+                     compression_suffix)
+
+__all__ = ('BufferReader',
+           'NodalException',
+           'NodalImage',
+           'RENDER_REVISION',
+           'VERSION',
+           'decimal_places',
+           'hop_limit',
+           'main',
+           'overview_pixels',
+           'region_box',
+           'scale_factor',
+           'tile_grid')
+
+VERSION = '0.2.0'
+#: Revision of the rendered output. Bumped whenever a change alters the
+#: images written for the same document & options, so renders cached by an
+#: earlier revision are never reused, even between releases.
+RENDER_REVISION = 3
+
+XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
+
+# Number of Edges to compute geometry for at once.
+EDGE_BATCH = 4096
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+# Atomic on every platform where available, else POSIX rename.
+replace = getattr(os, 'replace', os.rename)
+
+# Hover effects for INTERACTION_SCRIPT. Highlights every Edge leaving the
+# hovered Node, in the EDGE_COLORS hue each Edge's data-hue names, as the
+# SMIL animations do. Formatted with the colors, and the highlighted
+# stroke width.
+HOVER_SCRIPT = '''(function(){
+var colors=%s,outs={},edges=document.querySelectorAll('path[data-from]');
+for(var i=0;i<edges.length;i++){
+var from=edges[i].getAttribute('data-from');
+(outs[from]=outs[from]||[]).push(edges[i]);}
+function hover(paths,on){
+for(var i=0;i<paths.length;i++){
+var hue=paths[i].getAttribute('data-hue');
+paths[i].style.stroke=on?colors[hue]:'';
+paths[i].style.strokeWidth=on?'%spx':'';
+paths[i].style.markerEnd=on?'url(#arrow_head_'+hue+')':'';}}
+Object.keys(outs).forEach(function(id){
+var node=document.getElementById(id);
+if(!node){return;}
+node.addEventListener('mouseover',function(){hover(outs[id],true);});
+node.addEventListener('mouseout',function(){hover(outs[id],false);});});
+})();'''
+
+# Reach of Node graphics & Edge arrow heads beyond their coordinates, when
+# highlighted, for finding the elements crossing a region.
+EXTENT = 76800
+
+# Width of the cells Nodes are clustered in by overview images, in pixels.
+OVERVIEW_CELL = 3
+# Most lines drawn by overview images, per pixel of their longest side.
+OVERVIEW_LINES = 4
+# Height of a line of text box text, and the fewest pixels it must cover
+# for overview images to keep text boxes.
+TEXT_EXTENT = 66400
+TEXT_MIN_PIXELS = 6
+
+# Names of the tiles & manifest written by NodalImage.dump_tiles.
+TILE_FORMAT = 'tile_{row}_{column}'
+TILES_MANIFEST = 'tiles.json'
+
+# Random head (X mark) & parallel head (|| mark) glyphs, as segments.
+RANDOM_HEAD = ((LINE, 33408, 16704, 50112, 66752),
+               (LINE, 16704, 33408, 66752, 50112))
+PARALLEL_HEAD = ((LINE, 27840, 16704, 72320, 55680),
+                 (LINE, 11136, 27840, 55680, 66752))
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only binary file over a :class:`bytes`, :class:`bytearray`, or
+    :class:`memoryview` buffer, copying out only what is read.
 
-all = ('NodalImage',
-       'NodalException',
-       'VERSION',
-       'main')
+    :param data: The buffer to read.
+    :type data: :class:`bytes`
+
+    .. versionadded:: 0.2.0
+    """
 
-VERSION = '0.1.2'
+    def __init__(self, data):
+        view = memoryview(data)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast('B')
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        end = self._position + size
+        buffer[:size] = self._view[self._position:end]
+        self._position = end
+        return size
+
+    def readall(self):
+        data = self._view[self._position:].tobytes()
+        self._position = len(self._view)
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError('Negative seek position {0}'.format(offset))
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
 
 
 class NodalException(Exception):
@@ -51,33 +192,122 @@ class NodalImage(object):
 
         svg_dom_root = NodalImage(path_to_nod).generate()
 
+    Stream an SVG image without building a DOM tree::
+
+        from nod2svg.main import NodalImage
+
+        for chunk in NodalImage(path_to_nod).iterdump():
+            socket.sendall(chunk)
+
     .. versionadded:: 0.1.0
     """
     VERSION = VERSION
-    elements = {}
-    edges = {}
-    nodes = {}
-    textboxes = {}
-    bg = 'transparent'
+    #: Attributes that change the rendered SVG. Memoized output is
+    #: discarded whenever any of them change.
+    RENDER_OPTIONS = ('bg', 'ec', 'nc', 'ac', 'stylesheet', 'interaction',
+                      'scale', 'precision', 'region', 'overview', 'seeds',
+                      'hops', 'annotations')
+    #: Background color. ``None`` uses the document's style color, else
+    #: :attr:`DEFAULT_BG`.
+    #:
+    #: .. versionchanged:: 0.2.0
+    #:    Defaults to ``None``, and is no longer replaced by the
+    #:    document's color when loading.
+    bg = None
     ec = '#717589ff'
     nc = '#9b9effff'
-    ac = '#ffffff80'
+    #: Annotation color. ``None`` uses the document's style color, else
+    #: :attr:`DEFAULT_AC`.
+    #:
+    #: .. versionchanged:: 0.2.0
+    #:    Defaults to ``None``, and is no longer replaced by the
+    #:    document's color when loading.
+    ac = None
+    #: Background color when neither :attr:`bg` nor the document sets one.
+    #:
+    #: .. versionadded:: 0.2.0
+    DEFAULT_BG = 'transparent'
+    #: Annotation color when neither :attr:`ac` nor the document sets one.
+    #:
+    #: .. versionadded:: 0.2.0
+    DEFAULT_AC = '#ffffff80'
+    #: Style graphics with classes from one shared ``<style>`` sheet,
+    #: instead of repeating presentation attributes on every element.
+    #:
+    #: .. versionadded:: 0.2.0
+    stylesheet = False
+    #: How mouseover highlighting is implemented. One of
+    #: :const:`~nod2svg.constants.INTERACTION_SMIL` for ``<set>``
+    #: animations on every element,
+    #: :const:`~nod2svg.constants.INTERACTION_SCRIPT` for a CSS rule & one
+    #: embedded script, or :const:`~nod2svg.constants.INTERACTION_STATIC`
+    #: for no interactivity at all.
+    #:
+    #: .. versionadded:: 0.2.0
+    interaction = INTERACTION_SMIL
+    #: Divide every coordinate & length by this factor, such as
+    #: :const:`~nod2svg.constants.GRID_TICK` to measure in grid cells.
+    #: Setting either :attr:`scale` or :attr:`precision` switches to compact
+    #: output, with rounded numbers & relative path data.
+    #:
+    #: .. versionadded:: 0.2.0
+    scale = None
+    #: Decimal places kept by compact output. Defaults to
+    #: :const:`~nod2svg.geometry.DEFAULT_PRECISION` when only :attr:`scale`
+    #: is set.
+    #:
+    #: .. versionadded:: 0.2.0
+    precision = None
+    #: Optional ``(x, y, width, height)`` rectangle in document units, as
+    #: for a ``viewBox``. When set, the image shows only this region, and
+    #: holds only the elements crossing it, found with
+    #: :meth:`spatial_index`.
+    #:
+    #: .. versionadded:: 0.2.0
+    region = None
+    #: Optional size in pixels of the longest side of a quick, low detail
+    #: overview image. See :meth:`render_overview`.
+    #:
+    #: .. versionadded:: 0.2.0
+    overview = None
+    _seeds = None
+    #: Most Edges followed from :attr:`seeds`, or ``None`` for no limit.
+    #:
+    #: .. versionadded:: 0.2.0
+    hops = None
+    #: How text box HTML is written. One of
+    #: :const:`~nod2svg.constants.ANNOTATIONS_PARSE` to parse & check each
+    #: text, keeping recent ones in :data:`~nod2svg.markup.markup_cache`,
+    #: :const:`~nod2svg.constants.ANNOTATIONS_INLINE` to stream texts as
+    #: they are, trusting them to be well formed, or
+    #: :const:`~nod2svg.constants.ANNOTATIONS_NONE` to leave text boxes out
+    #: for quick previews.
+    #:
+    #: .. versionadded:: 0.2.0
+    annotations = ANNOTATIONS_PARSE
+    #: Opt-in instrumentation. When ``True``, the duration & item count of
+    #: each phase is recorded in :attr:`stats`. When callable, it is also
+    #: called as ``instrument(phase, seconds, count)`` as each phase ends.
+    #:
+    #: .. versionadded:: 0.2.0
+    instrument = None
+    #: Element fields kept when loading, besides
+    #: :const:`~nod2svg.parser.ELEMENT_FIELDS`, so that :meth:`lookup` can
+    #: search them. ``None`` keeps every field, at the cost of memory.
+    #:
+    #: .. versionadded:: 0.2.0
+    fields = ()
     title = None
     author = None
     comment = None
 
-    mbr = [99999999999999,
-           99999999999999,
-           -99999999999999,
-           -99999999999999]
-
     @property
     def background_color(self):
         """(:class:`basestring`)
         The hexadecimal value of the background color
         .. versionadded:: 0.1.0
         """
-        return self.bg[:7]
+        return self.background[:7]
 
     @property
     def background_opacity_color(self):
@@ -85,7 +315,41 @@ class NodalImage(object):
         The percent value of the background opacity
         .. versionadded:: 0.1.0
         """
-        return STRING_FLOAT_FORMAT.format(int(self.bg[-2:], 16) / 256.0)
+        return STRING_FLOAT_FORMAT.format(
+            int(self.background[-2:], 16) / 256.0)
+
+    @property
+    def background(self):
+        """(:class:`basestring`)
+        The background color in effect: :attr:`bg`, else the document's
+        style color, else :attr:`DEFAULT_BG`.
+
+        .. versionadded:: 0.2.0
+        """
+        if self.bg is not None:
+            return self.bg
+        elif self.document_bg is not None:
+            return self.document_bg
+        return self.DEFAULT_BG
+
+    @property
+    def seeds(self):
+        """(:class:`tuple`)
+        Optional keys of Nodes to start from. When set, the image holds
+        only the Nodes & Edges reachable from them by following Edges,
+        found with :attr:`adjacency`, and is framed around those Nodes. See
+        :meth:`reachable`. Any iterable of keys, or a single key, is kept
+        as a tuple.
+
+        .. versionadded:: 0.2.0
+        """
+        return self._seeds
+
+    @seeds.setter
+    def seeds(self, seeds):
+        if seeds is not None:
+            seeds = (seeds,) if isinstance(seeds, str) else tuple(seeds)
+        self._seeds = seeds
 
     @property
     def node_color(self):
@@ -148,111 +412,630 @@ class NodalImage(object):
 
         .. versionadded:: 0.1.0
         """
-        return self.ac[:7]
+        return self.annotation[:7]
 
     @property
     def annotation_opacity_color(self):
         """(:class:`basestring`)
         The percent value of the Annotation opacity."""
-        return STRING_FLOAT_FORMAT.format(int(self.ac[-2:], 16) / 256.0)
+        return STRING_FLOAT_FORMAT.format(
+            int(self.annotation[-2:], 16) / 256.0)
 
-    def __init__(self, path=None):
+    @property
+    def annotation(self):
+        """(:class:`basestring`)
+        The annotation color in effect: :attr:`ac`, else the document's
+        style color, else :attr:`DEFAULT_AC`.
+
+        .. versionadded:: 0.2.0
+        """
+        if self.ac is not None:
+            return self.ac
+        elif self.document_ac is not None:
+            return self.document_ac
+        return self.DEFAULT_AC
+
+    def __init__(self, path=None, instrument=None, data=None, fields=(),
+                 **options):
         """
         Initialize NodalImage instance.
 
-        Will load Nodal document if ``path`` argument is given.
+        Will load Nodal document if ``path`` or ``data`` argument is given.
 
-        :param path: Optional path of Nodal. Default=``None``
+        :param path: Optional path of Nodal, or binary file-like object.
+                     Default=``None``
         :type path: :class:`basestring`
+        :param instrument: Optional :attr:`instrument` setting.
+        :type instrument: :class:`bool` or :class:`collections.Callable`
+        :param data: Optional contents of a Nodal document. See
+                     :meth:`loads`.
+        :type data: :class:`bytes`
+        :param fields: Optional :attr:`fields` setting.
+        :type fields: :class:`collections.Iterable`
+        :param options: Initial values of any :attr:`RENDER_OPTIONS`.
+        :raises: :class:`TypeError` for unknown options.
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Document state is held per instance, and render options may be
+           given as keyword arguments. Added ``data`` & ``fields``, and
+           ``path`` may be a file-like object.
         """
-        if path:
+        for name in options:
+            if name not in self.RENDER_OPTIONS:
+                raise TypeError('Unknown render option {0!r}'.format(name))
+        self.instrument = instrument
+        self.fields = fields
+        self.reset()
+        for name in options:
+            setattr(self, name, options[name])
+        if data is not None:
+            self.loads(data)
+        elif path:
             self.load(path)
 
-    def dump(self, path):
+    def reset(self):
+        """
+        Discard any loaded document, and return the instance to an empty
+        state so it can be reused to render another document.
+
+        Element tables, meta-data, the minimum bounding rectangle, and the
+        document provided background & annotation colors are cleared.
+        Render options, including colors, are kept.
+
+        .. versionadded:: 0.2.0
+        """
+        self.elements = {}
+        self.edges = {}
+        self.nodes = {}
+        self.textboxes = {}
+        self.indexes = {}
+        #: Keys of each Node's outgoing Edges, in document order, by the
+        #: Node's key.
+        self.adjacency = {}
+        #: Each Edge's index among its start Node's outgoing Edges, by the
+        #: Edge's key. Cycles the hover colors of Edges.
+        self.out_index = {}
+        #: Phase measurements, recorded when :attr:`instrument` is set.
+        #: Maps phase name to a ``{'seconds': ..., 'count': ...}``
+        #: dictionary.
+        self.stats = {}
+        self.title = None
+        self.author = None
+        self.comment = None
+        self.mbr = [99999999999999,
+                    99999999999999,
+                    -99999999999999,
+                    -99999999999999]
+        #: The document's background & annotation style colors, used
+        #: unless :attr:`bg` & :attr:`ac` are set.
+        self.document_bg = None
+        self.document_ac = None
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Discard the memoized SVG tree & serialized bytes.
+
+        Called automatically by :meth:`load` & :meth:`reset`, and whenever
+        one of :attr:`RENDER_OPTIONS` has changed since the last render.
+        Call directly after mutating loaded elements or meta-data.
+
+        .. versionadded:: 0.2.0
+        """
+        self._memo = {}
+        self._memo_key = None
+        self._spatial = None
+        self._legs = {}
+        self._levels = {}
+
+    def render_options(self):
+        """
+        Current values of all :attr:`RENDER_OPTIONS`.
+
+        :rtype: :class:`dict`
+
+        .. versionadded:: 0.2.0
+        """
+        return dict((name, getattr(self, name))
+                    for name in self.RENDER_OPTIONS)
+
+    def quantization(self):
+        """
+        The ``(scale, precision)`` of compact output, or ``None`` when
+        coordinates are written as they are. See :attr:`scale`.
+
+        :rtype: :class:`tuple`
+        :raises: :class:`NodalException` for a scale that is not positive,
+                 or a precision that is not a whole number of places.
+
+        .. versionadded:: 0.2.0
+        """
+        if self.scale is None and self.precision is None:
+            return None
+        scale = 1.0 if self.scale is None else float(self.scale)
+        if scale <= 0:
+            raise NodalException('Scale must be positive, not {0!r}'.format(
+                self.scale))
+        precision = self.precision
+        if precision is None:
+            precision = DEFAULT_PRECISION
+        elif not isinstance(precision, numbers.Integral) or precision < 0:
+            raise NodalException('Precision must be a whole number of '
+                                 'decimal places, not {0!r}'.format(
+                                     precision))
+        return scale, precision
+
+    def _formatters(self):
+        """Return functions formatting lengths, and path segments."""
+        quantization = self.quantization()
+        if quantization is None:
+            return '{0}'.format, format_path
+        scale, precision = quantization
+
+        def length(value):
+            return format_number(value / scale, precision)
+
+        def path(segment):
+            return format_compact_path(segment, scale, precision)
+        return length, path
+
+    def bounds(self):
+        """
+        The ``(x, y, width, height)`` of the whole image, which is the
+        minimum bounding rectangle padded by two grid ticks.
+
+        :rtype: :class:`tuple`
+
+        .. versionadded:: 0.2.0
+        """
+        t = self.mbr[0] - GRID_TICK * 2
+        l = self.mbr[1] - GRID_TICK * 2
+        width = abs(t) + abs(self.mbr[2] + GRID_TICK * 2)
+        height = abs(l) + abs(self.mbr[3] + GRID_TICK * 2)
+        return t, l, width, height
+
+    def spatial_index(self):
+        """
+        Index Nodes, Edges, and text boxes by their bounding boxes, keyed
+        like :attr:`elements`.
+
+        Nodes & Edges are padded by the reach of their highlighted strokes
+        & arrow heads, while text boxes are indexed by their position
+        alone. The line segments of Edges' paths are kept alongside, for
+        :meth:`query_region`. Built on first use, and kept until
+        :meth:`invalidate`.
+
+        :rtype: :class:`~nod2svg.spatial.GridIndex`
+
+        .. versionadded:: 0.2.0
+        """
+        if self._spatial is not None:
+            return self._spatial
+        index = GridIndex()
+        for k, v in self.nodes.items():
+            if v.x is not None:
+                index.insert(k, (v.x - EXTENT, v.y - EXTENT,
+                                 v.x + EXTENT, v.y + EXTENT))
+        legs = {}
+        for k, v in self.edges.items():
+            start = self.nodes.get('{0}'.format(v.from_node))
+            end = self.nodes.get('{0}'.format(v.to_node))
+            if start is None or end is None or start.x is None or \
+                    end.x is None:
+                continue
+            index.insert(k, (min(start.x, end.x) - EXTENT,
+                             min(start.y, end.y) - EXTENT,
+                             max(start.x, end.x) + EXTENT,
+                             max(start.y, end.y) + EXTENT))
+            a = (start.x, start.y)
+            b = (end.x, end.y)
+            if v.path == DIRECT:
+                legs[k] = ((a, b),)
+            elif v.path == CITYBLOCK:
+                corner = (end.x, start.y)
+                legs[k] = ((a, corner), (corner, b))
+            elif v.path == CITYBLOCKFLIPPED:
+                corner = (start.x, end.y)
+                legs[k] = ((a, corner), (corner, b))
+        self._legs = legs
+        for k, v in self.textboxes.items():
+            if v.x is not None:
+                index.insert(k, (v.x, v.y, v.x, v.y))
+        self._spatial = index
+        return index
+
+    def query_region(self, region):
+        """
+        Find the Nodes, Edges, and text boxes crossing ``region``.
+
+        Edges are found by their bounding boxes, and then kept only when
+        one of their legs, padded like :meth:`spatial_index`, crosses
+        ``region``. Long diagonal Edges are so left out of the many regions
+        their bounding boxes cover, but their lines don't.
+
+        :param region: ``(x, y, width, height)`` in document units.
+        :type region: :class:`tuple`
+        :returns: Keys of matching :attr:`elements`.
+        :rtype: :class:`set`
+
+        .. versionadded:: 0.2.0
+        """
+        x, y, width, height = region
+        found = self.spatial_index().query((x, y, x + width, y + height))
+        padded = (x - EXTENT, y - EXTENT, x + width + EXTENT,
+                  y + height + EXTENT)
+        legs = self._legs
+        for k in [k for k in found if k in legs]:
+            if not any(crosses(a, b, padded) for a, b in legs[k]):
+                found.discard(k)
+        return found
+
+    def reachable(self, seeds, hops=None):
+        """
+        Find the Nodes & Edges reachable from ``seeds`` by following Edges
+        from their start to their end Nodes, breadth first.
+
+        Only the :attr:`adjacency` of reached Nodes is visited, so the cost
+        follows the size of what is found rather than of the document.
+
+        :param seeds: Keys of Nodes to start from.
+        :type seeds: :class:`collections.Iterable`
+        :param hops: Most Edges followed from a seed, or ``None`` for no
+                     limit.
+        :type hops: :class:`numbers.Integral`
+        :returns: Keys of the Nodes found, and keys of the Edges followed,
+                  in the order found.
+        :rtype: :class:`tuple`
+        :raises: :class:`NodalException` for unknown Nodes, or negative
+                 ``hops``.
+
+        .. versionadded:: 0.2.0
+        """
+        nodes, edges = self._walk(seeds, hops)
+        return nodes, [k for k, _, _ in edges]
+
+    def _walk(self, seeds, hops):
+        if hops is not None and (not isinstance(hops, numbers.Integral) or
+                                 hops < 0):
+            raise NodalException('Hops must be a non-negative integer, not '
+                                 '{0!r}'.format(hops))
+        if isinstance(seeds, str):
+            seeds = (seeds,)
+        nodes = []
+        depths = {}
+        for seed in seeds:
+            key = '{0}'.format(seed)
+            if key not in self.nodes:
+                raise NodalException('Unknown Node {0!r}'.format(seed))
+            if key not in depths:
+                depths[key] = 0
+                nodes.append(key)
+        # Edges followed, with their start Node's key, and their index
+        # among its outgoing Edges.
+        edges = []
+        position = 0
+        while position < len(nodes):
+            key = nodes[position]
+            position += 1
+            depth = depths[key]
+            if hops is not None and depth >= hops:
+                continue
+            for edge_idx, k in enumerate(self.adjacency.get(key, ())):
+                to_key = '{0}'.format(self.edges[k].to_node)
+                if to_key not in self.nodes:
+                    continue
+                edges.append((k, key, edge_idx))
+                if to_key not in depths:
+                    depths[to_key] = depth + 1
+                    nodes.append(to_key)
+        return nodes, edges
+
+    def _subgraph(self):
+        """Return the walk from :attr:`seeds`, or ``None`` for all."""
+        if self.seeds is None:
+            return None
+        return self._memoize('subgraph',
+                             lambda: self._walk(self.seeds, self.hops))
+
+    def _frame(self, keys):
+        """Return the bounds of Nodes ``keys``, padded like :meth:`bounds`."""
+        xs = [self.nodes[k].x for k in keys if self.nodes[k].x is not None]
+        ys = [self.nodes[k].y for k in keys if self.nodes[k].y is not None]
+        if not xs:
+            return self.bounds()
+        left = min(xs) - GRID_TICK * 2
+        top = min(ys) - GRID_TICK * 2
+        return (left, top, max(xs) + GRID_TICK * 2 - left,
+                max(ys) + GRID_TICK * 2 - top)
+
+    def _selection(self):
+        """Return keys of the elements to render, or ``None`` for all."""
+        if self.region is None:
+            return None
+        region = self._region()
+        return self._memoize('selection', lambda: self.query_region(region))
+
+    def _selected(self, table):
+        """
+        Return keys of ``table`` within :meth:`_selection` in document
+        order, or all keys when there is no selection.
+        """
+        selection = self._selection()
+        if selection is None:
+            return table
+        return sorted((k for k in selection if k in table),
+                      key=lambda k: table[k].number)
+
+    def _region(self):
+        try:
+            x, y, width, height = self.region
+        except (TypeError, ValueError):
+            valid = False
+        else:
+            valid = not [n for n in (x, y, width, height)
+                         if not isinstance(n, numbers.Real)]
+        if not valid:
+            raise NodalException('Region must be x, y, width & height, not '
+                                 '{0!r}'.format(self.region))
+        if width <= 0 or height <= 0:
+            raise NodalException('Region must have a positive size, not '
+                                 '{0!r}'.format(self.region))
+        return x, y, width, height
+
+    def _record(self, phase, started, count):
+        seconds = timer() - started
+        self.stats[phase] = {'seconds': seconds, 'count': count}
+        if callable(self.instrument):
+            self.instrument(phase, seconds, count)
+
+    def _options_key(self):
+        return tuple(getattr(self, name) for name in self.RENDER_OPTIONS)
+
+    def _memoize(self, name, factory):
+        key = self._options_key()
+        if key != self._memo_key:
+            self._memo = {}
+            self._memo_key = key
+        if name not in self._memo:
+            self._memo[name] = factory()
+        return self._memo[name]
+
+    def dump(self, path, compression=None):
         """
         Generates and writes an SVG document to a system path.
 
+        The document is compressed while it is written when ``compression``
+        is given, or when implied by the extension of ``path``, such as
+        ``.svgz``. See :func:`~nod2svg.writer.compression_for`.
+
         :param path: The system path to write an SVG to.
         :type path: :class:`basestring`
+        :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+                            Defaults to the codec implied by ``path``.
+        :type compression: :class:`basestring`
+        :raises: :class:`ValueError` for unknown or unavailable codecs.
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Writes the memoized bytes of :meth:`dumps` when available, or
+           else streams the document with :meth:`stream`, into a
+           temporary file that replaces ``path`` once complete. Added
+           ``compression``.
         """
-        root = self.generate()
-        tree = ET.ElementTree(root)
-        tree.write(path, encoding="utf-8", xml_declaration=True)
+        if compression is None:
+            compression = compression_for(path)
+        if 'bytes' in self._memo and self._memo_key == self._options_key():
+            chunks = (XML_DECLARATION, self._memo['bytes'])
+        else:
+            chunks = self.iterdump(xml_declaration=True)
+        chunks = compress(chunks, compression)
+        fd, temporary = _create_temporary(path)
+        try:
+            with fd:
+                for chunk in chunks:
+                    fd.write(chunk)
+            replace(temporary, path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
 
     def dumps(self):
         """
         Generates and returns an SVG document.
 
+        The result is memoized until the document or a style attribute
+        changes.
+
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Memoized between calls, and serialized with :meth:`iterdump`.
         """
-        return ET.tostring(self.generate(), encoding="utf-8")
+        return self._memoize('bytes', lambda: b''.join(self.iterdump()))
 
     def load(self, path):
         """
-        Read Nodal document from system path.
+        Read Nodal document from system path, or binary file-like object.
 
-        Loads meta-data, style, and element properties.
+        Loads meta-data, style, and element properties. Any previously
+        loaded document is discarded first.
 
-        :param path: The path to a Nodal document.
+        :param path: The path to a Nodal document, or a readable binary
+                     file-like object.
         :type path: :class:`basestring`
         :raises: :class:`NodalException`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Calls :meth:`reset` before reading, and records ``'parse'`` &
+           ``'index'`` phases when instrumented. Accepts file-like objects.
+           Parsed by :func:`nod2svg.parser.parse`, keeping only the element
+           fields needed to render & any other :attr:`fields`, and reading
+           binary documents too.
         """
-        with open(path, 'rb') as fd:
-            nod = plistlib.readPlist(fd)
-            if ELEMENTS not in nod:
-                raise NodalException('Not a Nodal matrix')
-            self.elements = nod[ELEMENTS]
-            if AUTHOR in nod:
-                self.author = nod[AUTHOR]
-            if TITLE in nod:
-                self.title = nod[TITLE]
-            if COMMENT in nod:
-                self.comment = nod[COMMENT]
-            if STYLE_BACKGROUND_COLOR in nod:
-                self.bg = nod[STYLE_BACKGROUND_COLOR]
-            if STYLE_ANNOTATION_COLOR in nod:
-                self.ac = nod[STYLE_ANNOTATION_COLOR]
-        self.nodes = self.lookup(TYPE, NODE)
-        self.edges = self.lookup(TYPE, EDGE)
-        self.textboxes = self.lookup(TYPE, TEXTBOX)
+        self.reset()
+        if hasattr(path, 'read'):
+            self._read(path)
+        else:
+            with open(path, 'rb') as fd:
+                self._read(fd)
+
+    def loads(self, data):
+        """
+        Read Nodal document from memory.
+
+        The buffer is read in place through a :class:`BufferReader`,
+        rather than copied whole.
+
+        :param data: Contents of a Nodal document.
+        :type data: :class:`bytes`, :class:`bytearray`, or
+                    :class:`memoryview`
+        :raises: :class:`NodalException`
+
+        .. versionadded:: 0.2.0
+        """
+        self.reset()
+        self._read(BufferReader(data))
+
+    def _read(self, fd):
+        started = timer()
+        try:
+            if self.fields is None:
+                fields = None
+            else:
+                fields = ELEMENT_FIELDS + tuple(self.fields)
+            nod = parse_document(fd, fields, factory=record)
+        except ValueError as err:
+            raise NodalException('Invalid Nodal document: {0}'.format(err))
+        if not isinstance(nod, dict) or ELEMENTS not in nod:
+            raise NodalException('Not a Nodal matrix')
+        self.elements = nod[ELEMENTS]
+        if AUTHOR in nod:
+            self.author = nod[AUTHOR]
+        if TITLE in nod:
+            self.title = nod[TITLE]
+        if COMMENT in nod:
+            self.comment = nod[COMMENT]
+        if STYLE_BACKGROUND_COLOR in nod:
+            self.document_bg = nod[STYLE_BACKGROUND_COLOR]
+        if STYLE_ANNOTATION_COLOR in nod:
+            self.document_ac = nod[STYLE_ANNOTATION_COLOR]
+        if self.instrument:
+            self._record('parse', started, len(self.elements))
+            started = timer()
+        self.index_elements()
+        if self.instrument:
+            self._record('index', started, len(self.elements))
+
+    def index_elements(self):
+        """
+        Walk all elements once, bucketing each by
+        :const:`nod2svg.constants.TYPE` into :attr:`nodes`, :attr:`edges`, and
+        :attr:`textboxes`.
+
+        Nodes, edges, and text boxes are numbered for their DOM IDs, and if
+        an element has key :const:`nod2svg.constants.TICKPOS` then grow
+        minimum bounding rectangle.
+
+        Elements given as dictionaries, rather than loaded, are converted
+        to :mod:`~nod2svg.records` first. Edges are then indexed by their
+        start Node into :attr:`adjacency` & :attr:`out_index`.
+
+        The buckets also prime the :const:`~nod2svg.constants.TYPE` index
+        used by :meth:`lookup`.
+
+        .. versionadded:: 0.2.0
+        """
+        drawn = (NODE, EDGE, TEXTBOX)
+        types = {}
+        for key in self.elements:
+            node = self.elements[key]
+            if isinstance(node, dict):
+                node = self.elements[key] = record(node)
+            if TYPE not in node:
+                continue
+            kind = node[TYPE]
+            try:
+                matches = types.setdefault(kind, {})
+            except TypeError:
+                continue
+            if kind in drawn:
+                # Number the DOM ID for future reference.
+                node.number = len(matches)
+                if getattr(node, 'x', None) is not None:
+                    node.x, node.y = self.grow_minimum_bounding_rectangle(
+                        node.x, node.y)
+            matches[key] = node
+        self.indexes = {TYPE: types}
+        self.nodes = types.get(NODE, {})
+        self.edges = types.get(EDGE, {})
+        self.textboxes = types.get(TEXTBOX, {})
+        adjacency = {}
+        out_index = {}
+        for k in self.edges:
+            from_key = '{0}'.format(self.edges[k].from_node)
+            outs = adjacency.setdefault(from_key, [])
+            out_index[k] = len(outs)
+            outs.append(k)
+        self.adjacency = adjacency
+        self.out_index = out_index
 
     def lookup(self, attr, val):
         """
-        Iterate over all elements and return a dictionary with matching
-        scope (``attr``) & value (``val``)
+        Return a dictionary of all elements with matching scope (``attr``) &
+        value (``val``)
 
-        If element has key :const:`nod2svg.constants.TICKPOS` then parse tick
-        position, grow minimum bounding rectangle, and index coordinates.
+        The first lookup of an ``attr`` indexes every element by that key,
+        and later lookups of the same ``attr`` are answered from the index.
+        Only :const:`~nod2svg.parser.ELEMENT_FIELDS` & :attr:`fields` are
+        loaded, so other attributes must be added to :attr:`fields` before
+        loading.
 
         :param attr: The directory key to scan for.
         :type attr: :class:`basestring`
         :param val: The value to filter by.
         :type val: :class:`basestring`
+        :rtype: :class:`dict`
+        :raises: :class:`NodalException` when nothing is found for an
+                 ``attr`` that was not loaded.
 
         .. versionadded:: 0.1.0
         .. versionchanged:: 0.1.1
            Generate DOM ID attributes for all elements.
+        .. versionchanged:: 0.2.0
+           Answered from a per-attribute index. DOM IDs & coordinates are
+           assigned by :meth:`index_elements` while loading instead. Raises
+           for fields left out of :attr:`fields`.
         """
-        matches = {}
-        for key in self.elements:
-            node = self.elements[key]
-            if attr in node and node[attr] == val:
-                # Generate DOM ID for future reference.
-                node[DOM_ID] = ID_FORMAT.format(val, len(matches))
-                if TICKPOS in node:
-                    x, y = self.parse_tick_position(node[TICKPOS])
-                    node[X], node[Y] = self.grow_minimum_bounding_rectangle(x,
-                                                                            y)
-                matches[key] = node
-        return matches
+        if attr not in self.indexes:
+            index = {}
+            for key in self.elements:
+                node = self.elements[key]
+                if attr in node:
+                    try:
+                        index.setdefault(node[attr], {})[key] = node
+                    except TypeError:
+                        # Unhashable values, such as arrays, can't be indexed.
+                        pass
+            if not index and not self._loaded(attr):
+                raise NodalException(
+                    'Element field {0!r} was not loaded; add it to '
+                    'fields before loading'.format(attr))
+            self.indexes[attr] = index
+        try:
+            return dict(self.indexes[attr].get(val, {}))
+        except TypeError:
+            return {}
+
+    def _loaded(self, attr):
+        """Return whether element field ``attr`` is kept when loading."""
+        return (self.fields is None or attr in ELEMENT_FIELDS or
+                attr in self.fields or attr in (X, Y, DOM_ID))
 
     def parse_tick_position(self, attr):
         """
@@ -267,6 +1050,9 @@ class NodalImage(object):
         :rtype: :class:`tuple`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           No longer used while loading, as records parse their own tick
+           positions. See :func:`nod2svg.records.parse_tick_position`.
         """
         attr = attr.lstrip('{').rstrip('}')
         return attr.split(', ')
@@ -308,38 +1094,83 @@ class NodalImage(object):
         .. versionchanged:: 0.1.1
             Mouseover events now build Node elements and connected
             Edge elements.
+        .. versionchanged:: 0.2.0
+            Rendered through a :class:`~nod2svg.writer.TreeWriter`.
+        """
+        for _ in self.render_nodes(TreeWriter(root)):
+            pass
+
+    def render_nodes(self, w):
         """
-        group = ET.SubElement(root, 'g')
+        Emit Node graphics to writer ``w``. See :meth:`generate_nodes`.
+
+        Yields after each Node, so callers can drain streamed output.
+        Styled by class when :attr:`stylesheet` is set, and animated
+        according to :attr:`interaction`.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+
+        .. versionadded:: 0.2.0
+        """
+        w.start('g', {})
+        length, _ = self._formatters()
+        # Resolve colors once, rather than for every Node.
+        if self.stylesheet:
+            paint = {'class': 'node'}
+            dashed = {'class': 'node dashed'}
+        else:
+            paint = {'fill': self.node_fill_color,
+                     'fill-opacity': self.node_fill_opacity_color,
+                     'stroke': self.node_color,
+                     'stroke-opacity': self.node_opacity_color,
+                     'stroke-width': length(6400)}
+            dashed = dict(paint)
+            dashed['stroke-dasharray'] = '{0} {1}'.format(length(32000),
+                                                          length(12800))
+        smil = self.interaction == INTERACTION_SMIL
+        radius = length(64000)
+        highlight = length(12800)
         n = self.nodes
-        for k in n:
+        selection = self._selection()
+        subgraph = self._subgraph()
+        if subgraph is None:
+            keys = self._selected(n)
+        elif selection is None:
+            keys = subgraph[0]
+        else:
+            keys = [k for k in subgraph[0] if k in selection]
+        for k in keys:
             v = n[k]
-            dot_attr = {'cx': '{0}'.format(v[X]),
-                        'cy': '{0}'.format(v[Y]),
-                        'id': v[DOM_ID],
-                        'r': '64000',
-                        'fill': self.node_fill_color,
-                        'fill-opacity': self.node_fill_opacity_color,
-                        'stroke': self.node_color,
-                        'stroke-opacity': self.node_opacity_color,
-                        'stroke-width': '6400'}
-            dot = ET.SubElement(group, 'circle', **dot_attr)
-            sa = {'attributeName': 'stroke-width',
-                  'to': '12800',
-                  'begin': '{0}.mouseover'.format(v[DOM_ID]),
-                  'end': '{0}.mouseout'.format(v[DOM_ID])}
-            s = ET.SubElement(dot, 'set', **sa)
-            if DONT_PLAY_NOTE in v and v[DONT_PLAY_NOTE]:
-                dot.attrib['stroke-dasharray'] = '32000 12800'
-            if v['SignallingMethod'] == 'Parallel':
+            dom_id = v.dom_id
+            dot_attr = {'cx': length(v.x),
+                        'cy': length(v.y),
+                        'id': dom_id,
+                        'r': radius}
+            if v.dont_play_note:
+                dot_attr.update(dashed)
+            else:
+                dot_attr.update(paint)
+            w.start('circle', dot_attr)
+            if smil:
+                sa = {'attributeName': 'stroke-width',
+                      'to': highlight,
+                      'begin': '{0}.mouseover'.format(dom_id),
+                      'end': '{0}.mouseout'.format(dom_id)}
+                w.element('set', sa)
+            w.end('circle')
+            if v.signalling_method == 'Parallel':
                 use_attr = {'xlink:href': '#parallel_head',
-                            'x': '{0}'.format(v[X]),
-                            'y': '{0}'.format(v[Y])}
-                use = ET.SubElement(group, 'use', **use_attr)
-            elif v['SignallingMethod'] == 'Random':
+                            'x': length(v.x),
+                            'y': length(v.y)}
+                w.element('use', use_attr)
+            elif v.signalling_method == 'Random':
                 use_attr = {'xlink:href': '#random_head',
-                            'x': '{0}'.format(v[X]),
-                            'y': '{0}'.format(v[Y])}
-                use = ET.SubElement(group, 'use', **use_attr)
+                            'x': length(v.x),
+                            'y': length(v.y)}
+                w.element('use', use_attr)
+            yield
+        w.end('g')
 
     def generate_edges(self, root):
         """
@@ -355,68 +1186,164 @@ class NodalImage(object):
             Each edge is now isolated within a group element,
             and includes arrow head marker and Node mouseover
             effects.
+        .. versionchanged:: 0.2.0
+            Outgoing edges are counted locally instead of being
+            recorded on Node elements, and arrow heads refer to the
+            shared markers of :meth:`render_markers`.
+        """
+        for _ in self.render_edges(TreeWriter(root)):
+            pass
+
+    def render_edges(self, w):
+        """
+        Emit Edge graphics to writer ``w``. See :meth:`generate_edges`.
+
+        Yields after each Edge, so callers can drain streamed output.
+        Styled by class when :attr:`stylesheet` is set, and animated
+        according to :attr:`interaction`. Path geometry is computed in
+        batches by :func:`nod2svg.geometry.segments`.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+
+        .. versionadded:: 0.2.0
         """
         e = self.edges
-        for k in e:
+        length, path = self._formatters()
+        # Resolve colors once, rather than for every Edge.
+        if self.stylesheet:
+            paint = {'class': 'edge'}
+            dashed = {'class': 'edge dashed'}
+        else:
+            paint = {'stroke': self.edge_color,
+                     'stroke-opacity': self.edge_opacity_color,
+                     'stroke-width': length(6400)}
+            dashed = dict(paint)
+            dashed['stroke-dasharray'] = '{0} {1}'.format(length(32000),
+                                                          length(12800))
+        highlight = length(12800)
+        smil = self.interaction == INTERACTION_SMIL
+        script = self.interaction == INTERACTION_SCRIPT
+
+        def flush(batch):
+            # Compute the geometry of the whole batch at once.
+            paths = [v.path for v, start, end, start_id, edge_idx in batch]
+            points = [(start.x, start.y, end.x, end.y)
+                      for v, start, end, start_id, edge_idx in batch]
+            segments = geometry.segments(paths, points)
+            for (v, start, end, start_id, edge_idx), segment in zip(batch,
+                                                                    segments):
+                hue = edge_idx % len(EDGE_COLORS)
+                edge_color = EDGE_COLORS[hue]
+                w.start('g', {})
+                line_attr = {'d': path(segment)}
+                if not self.stylesheet:
+                    line_attr['fill'] = 'transparent'
+                line_attr['id'] = v.dom_id
+                line_attr['marker-end'] = 'url(#arrow_head)'
+                if v.wormhole:
+                    line_attr.update(dashed)
+                else:
+                    line_attr.update(paint)
+                if script:
+                    line_attr['data-from'] = start_id
+                    line_attr['data-hue'] = '{0}'.format(hue)
+                w.start('path', line_attr)
+                if smil:
+                    sa = {'attributeName': 'stroke',
+                          'to': edge_color,
+                          'begin': '{0}.mouseover'.format(start_id),
+                          'end': '{0}.mouseout'.format(start_id)}
+                    w.element('set', sa)
+                    sa = {'attributeName': 'stroke-width',
+                          'to': highlight,
+                          'begin': '{0}.mouseover'.format(start_id),
+                          'end': '{0}.mouseout'.format(start_id)}
+                    w.element('set', sa)
+                    sa = {'attributeName': 'marker-end',
+                          'to': 'url(#arrow_head_{0})'.format(hue),
+                          'begin': '{0}.mouseover'.format(start_id),
+                          'end': '{0}.mouseout'.format(start_id)}
+                    w.element('set', sa)
+                w.end('path')
+                w.end('g')
+                yield
+
+        selection = self._selection()
+        subgraph = self._subgraph()
+        if subgraph is None:
+            entries = self._edge_entries(self._selected(e))
+        elif selection is None:
+            entries = subgraph[1]
+        else:
+            entries = [entry for entry in subgraph[1]
+                       if entry[0] in selection]
+        # DOM IDs of start Nodes.
+        ids = {}
+        batch = []
+        for k, from_key, edge_idx in entries:
             v = e[k]
-            start = self.nodes['{0}'.format(v[FROM_NODE])]
-            end = self.nodes['{0}'.format(v[TO_NODE])]
-
-            if EDGE_OUTS not in start:
-                start[EDGE_OUTS] = []
-            start[EDGE_OUTS].append(v['DOM_ID'])
-
-            if v[PATH] == DIRECT:
-                path = self.path_direct(start, end)
-            elif v[PATH] == CITYBLOCK:
-                path = self.path_city_block(start, end)
-            elif v[PATH] == CITYBLOCKFLIPPED:
-                path = self.path_city_block_flipped(start, end)
-            else:
+            if v.path not in geometry.SCALAR:
                 continue
-            edge_idx = len(start[EDGE_OUTS]) - 1
-            edge_color = EDGE_COLORS[edge_idx % len(EDGE_COLORS)]
-            g_edges = ET.SubElement(root, 'g')
-            # Arrow head
-            arrow_head_id = 'arrow_head_'+v['DOM_ID']
-            maker_attr = {'id': arrow_head_id,
-                          'orient': 'auto',
-                          'markerWidth': '6',
-                          'markerHeight': '6',
-                          'refX': '5.0',
-                          'refY': '3'}
-            maker = ET.SubElement(g_edges, 'marker', **maker_attr)
-            path_attr = {'d': 'M 0 0 V 6 L 6 3 Z',
-                         'fill': self.edge_color,
-                         'fill-opacity': self.edge_opacity_color}
-            arrow_head = ET.SubElement(maker,
-                                       'path',
-                                       **path_attr)
-            sa = {'attributeName': 'fill',
-                  'to': edge_color,
-                  'begin': '{0}.mouseover'.format(start[DOM_ID]),
-                  'end': '{0}.mouseout'.format(start[DOM_ID])}
-            s = ET.SubElement(arrow_head, 'set', **sa)
-            line_attr = {'d': path,
-                         'fill': 'transparent',
-                         'id': v['DOM_ID'],
-                         'marker-end': 'url(#{0})'.format(arrow_head_id),
-                         'stroke': self.edge_color,
-                         'stroke-opacity': self.edge_opacity_color,
-                         'stroke-width': '6400'}
-            line = ET.SubElement(g_edges, 'path', **line_attr)
-            if WORMHOLE in v and v[WORMHOLE]:
-                line.attrib['stroke-dasharray'] = '32000 12800'
-            sa = {'attributeName': 'stroke',
-                  'to': edge_color,
-                  'begin': '{0}.mouseover'.format(start[DOM_ID]),
-                  'end': '{0}.mouseout'.format(start[DOM_ID])}
-            s = ET.SubElement(line, 'set', **sa)
-            sa = {'attributeName': 'stroke-width',
-                  'to': '12800',
-                  'begin': '{0}.mouseover'.format(start[DOM_ID]),
-                  'end': '{0}.mouseout'.format(start[DOM_ID])}
-            s = ET.SubElement(line, 'set', **sa)
+            start = self.nodes[from_key]
+            end = self.nodes['{0}'.format(v.to_node)]
+
+            start_id = ids.get(from_key)
+            if start_id is None:
+                start_id = ids[from_key] = start.dom_id
+
+            batch.append((v, start, end, start_id, edge_idx))
+            if len(batch) >= EDGE_BATCH:
+                for _ in flush(batch):
+                    yield
+                batch = []
+        for _ in flush(batch):
+            yield
+
+    def _edge_entries(self, keys):
+        # Each Edge's key, its start Node's key, and its index among the
+        # start Node's outgoing Edges, which cycles hover colors. Indexes
+        # are counted over every Edge while loading, so colors match
+        # those of the whole image when only a region is rendered.
+        e = self.edges
+        out_index = self.out_index
+        for k in keys:
+            yield k, '{0}'.format(e[k].from_node), out_index[k]
+
+    def render_markers(self, w):
+        """
+        Emit the arrow head markers shared by all Edges to writer ``w``.
+
+        Edges end with ``#arrow_head``, and switch to ``#arrow_head_N``
+        while highlighted, where ``N`` indexes
+        :const:`~nod2svg.constants.EDGE_COLORS`.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+
+        .. versionadded:: 0.2.0
+        """
+        marker_attr = {'orient': 'auto',
+                       'markerWidth': '6',
+                       'markerHeight': '6',
+                       'refX': '5.0',
+                       'refY': '3'}
+        heads = [('arrow_head', self.edge_color)]
+        if self.interaction != INTERACTION_STATIC:
+            for hue, color in enumerate(EDGE_COLORS):
+                heads.append(('arrow_head_{0}'.format(hue), color))
+        for marker_id, color in heads:
+            attr = {'id': marker_id}
+            attr.update(marker_attr)
+            w.start('marker', attr)
+            path_attr = {'d': 'M 0 0 V 6 L 6 3 Z'}
+            if self.stylesheet and marker_id == 'arrow_head':
+                path_attr['class'] = 'arrow'
+            else:
+                path_attr['fill'] = color
+                path_attr['fill-opacity'] = self.edge_opacity_color
+            w.element('path', path_attr)
+            w.end('marker')
 
     def generate_text_boxes(self, root):
         """
@@ -431,29 +1358,70 @@ class NodalImage(object):
         :type root: :class:`xml.etree.cElementTree.Element`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+            Rendered through a :class:`~nod2svg.writer.TreeWriter`.
+        """
+        for _ in self.render_text_boxes(TreeWriter(root)):
+            pass
+
+    def render_text_boxes(self, w):
+        """
+        Emit text box graphics to writer ``w``.
+        See :meth:`generate_text_boxes`.
+
+        Yields after each text box, so callers can drain streamed output.
+        Styled by class when :attr:`stylesheet` is set. Markup is written
+        according to :attr:`annotations`.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+
+        .. versionadded:: 0.2.0
         """
         texts = self.textboxes
-        g_text = ET.SubElement(root, 'g')
-        w3_uri = 'http://www.w3.org/1999/xhtml'
-        fo_attr = {'width': '100%',
-                   'height': '100%',
-                   'stroke': self.annotation_color,
-                   'stroke-opacity': self.annotation_opacity_color,
-                   'requiredExtensions': w3_uri}
-        for k in texts:
+        w.start('g', {})
+        if self.stylesheet:
+            paint = {'class': 'annotation'}
+        else:
+            paint = {'stroke': self.annotation_color,
+                     'stroke-opacity': self.annotation_opacity_color}
+        quantization = self.quantization()
+        if self._subgraph() is not None:
+            # Text boxes aren't connected to any Node.
+            texts = {}
+        elif self.annotations == ANNOTATIONS_NONE:
+            texts = {}
+        inline = self.annotations == ANNOTATIONS_INLINE
+        for k in self._selected(texts):
             v = texts[k]
-            html = ET.fromstring(v[TEXT])
+            if inline:
+                markup = Markup.inline(v.text)
+            else:
+                markup = markup_cache.markup(v.text)
             #  Poorly attempt to scale text up to a level that can be viewed.
-            t = 'scale(4150) translate({}, {})'.format(-v[X] * 0.999755,
-                                                       -v[Y] * 0.999765)
-            fobject = ET.SubElement(g_text,
-                                    'foreignObject',
-                                    x='{0}'.format(v[X]),
-                                    y='{0}'.format(v[Y]),
-                                    transform=t,
-                                    **fo_attr)
-            html.attrib['xmlns'] = w3_uri
-            fobject.append(html)
+            if quantization is None:
+                t = 'scale(4150) translate({}, {})'.format(-v.x * 0.999755,
+                                                           -v.y * 0.999765)
+                x = '{0}'.format(v.x)
+                y = '{0}'.format(v.y)
+            else:
+                # Same placement, folding the translation into x & y.
+                scale, precision = quantization
+                t = 'scale({0:g})'.format(4150 / scale)
+                x = format_number(v.x * (1 - 0.999755), precision)
+                y = format_number(v.y * (1 - 0.999765), precision)
+            fo_attr = {'x': x,
+                       'y': y,
+                       'transform': t,
+                       'width': '100%',
+                       'height': '100%'}
+            fo_attr.update(paint)
+            fo_attr['requiredExtensions'] = XHTML_NAMESPACE
+            w.start('foreignObject', fo_attr)
+            w.markup(markup)
+            w.end('foreignObject')
+            yield
+        w.end('g')
 
     def generate(self):
         """
@@ -462,6 +1430,10 @@ class NodalImage(object):
 
         Returns root element to determine writing/output options.
 
+        The tree is memoized until the document or a style attribute
+        changes, and should be treated as read-only. Use :meth:`build` for
+        a fresh tree.
+
         :rtype: :class:`xml.etree.cElementTree.Element`
 
         .. versionadded:: 0.1.0
@@ -470,64 +1442,451 @@ class NodalImage(object):
             ``'refs'`` table.
         .. versionchanged:: 0.1.2
             Added title, command, and author attributes.
+        .. versionchanged:: 0.2.0
+            Memoized, and free of side effects on the loaded document.
+            Arrow head markers are shared, and placed in ``'defs'``.
+        """
+        return self._memoize('svg', self.build)
+
+    def build(self):
         """
+        Create a new SVG DOM tree, bypassing the memoized tree returned by
+        :meth:`generate`.
+
+        :rtype: :class:`xml.etree.cElementTree.Element`
+
+        When instrumented, also records a ``'build'`` phase counting all
+        elements in the tree.
+
+        .. versionadded:: 0.2.0
+        """
+        started = timer()
+        w = TreeWriter()
+        for _ in self.render(w):
+            pass
+        root = w.close()
+        if self.instrument:
+            self._record('build', started, sum(1 for _ in root.iter()))
+        return root
+
+    def render(self, w):
+        """
+        Emit the complete SVG document to writer ``w``.
+
+        This is a generator, yielding after every graphic element so that
+        a :class:`~nod2svg.writer.StreamWriter` can be drained as the
+        document is produced. See :meth:`iterdump`.
+
+        Emits :meth:`render_overview` instead when :attr:`overview` is set.
+
+        When instrumented, records ``'text_boxes'``, ``'edges'`` &
+        ``'nodes'`` phases, counting the elements actually drawn under the
+        current :attr:`region`, :attr:`seeds` & :attr:`annotations`. Their
+        durations include any time the caller spends handling output
+        between steps.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+
+        .. versionadded:: 0.2.0
+        """
+        if self.interaction not in INTERACTIONS:
+            raise NodalException('Unknown interaction {0!r}'.format(
+                self.interaction))
+        if self.annotations not in ANNOTATIONS:
+            raise NodalException('Unknown annotations {0!r}'.format(
+                self.annotations))
+        if self.overview is not None:
+            for _ in self.render_overview(w):
+                yield
+            return
+        length, path = self._formatters()
+        # The minimum bounding rectangle is complete once loaded, so the
+        # viewBox can be written up front.
+        if self.region is not None:
+            t, l, width, height = self._region()
+        elif self.seeds is not None:
+            t, l, width, height = self._frame(self._subgraph()[0])
+        else:
+            t, l, width, height = self.bounds()
+        view_box = ' '.join(length(n) for n in (t, l, width, height))
         svg_attr = {'xmlns': 'http://www.w3.org/2000/svg',
                     'xmlns:xlink': 'http://www.w3.org/1999/xlink',
                     'version': '1.1',
-                    'style': 'background:{};'.format(self.background_color)}
-        svg = ET.Element('svg',
-                         **svg_attr)
-        defs = ET.SubElement(svg, 'defs')
+                    'style': 'background:{};'.format(self.background_color),
+                    'viewBox': view_box}
+        w.start('svg', svg_attr)
+        w.start('defs', {})
 
         # Random head (X mark)
         # Path needs to be re-calculated
         # data = 'M 20000 2000 L 85000 70000 M 2000 20000 L 70000 85000'
-        data = 'M 33408 16704 L 50112 66752 M 16704 33408 L 66752 50112'
-
+        data = ' '.join(path(segment) for segment in RANDOM_HEAD)
+
+        if self.stylesheet or self.interaction == INTERACTION_SCRIPT:
+            w.start('style', {'type': 'text/css'})
+            w.data(self.style_sheet())
+            w.end('style')
+        if self.stylesheet:
+            glyph_paint = {'class': 'glyph'}
+        else:
+            glyph_paint = {'stroke': self.node_color,
+                           'stroke-opacity': self.node_opacity_color,
+                           'stroke-width': length(6400)}
         random_attr = {'d': data,
-                       'id': 'random_head',
-                       'stroke': self.node_color,
-                       'stroke-opacity': self.node_opacity_color,
-                       'stroke-width': '6400'}
-        path = ET.SubElement(defs,
-                             'path',
-                             **random_attr)
+                       'id': 'random_head'}
+        random_attr.update(glyph_paint)
+        w.element('path', random_attr)
         # Parallel head (|| mark)
         # Path needs to be re-calculated
         # data = 'M 32000 6400 L 58000 82000 M 6400 32000 L 82000 58000'
-        data = 'M 27840 16704 L 72320 55680 M 11136 27840 L 55680 66752'
+        data = ' '.join(path(segment) for segment in PARALLEL_HEAD)
         parallel_attr = {'d': data,
-                         'id': 'parallel_head',
-                         'stroke': self.node_color,
-                         'stroke-opacity': self.node_opacity_color,
-                         'stroke-width': '6400'}
-        path = ET.SubElement(defs,
-                             'path',
-                             **parallel_attr)
-
+                         'id': 'parallel_head'}
+        parallel_attr.update(glyph_paint)
+        w.element('path', parallel_attr)
+        self.render_markers(w)
+        w.end('defs')
+        self._render_meta(w)
+        yield
+        phases = (('text_boxes', self.render_text_boxes),
+                  ('edges', self.render_edges),
+                  ('nodes', self.render_nodes))
+        for phase, renderer in phases:
+            started = timer()
+            # Renderers yield once per element drawn.
+            count = 0
+            for _ in renderer(w):
+                count += 1
+                yield
+            if self.instrument:
+                self._record(phase, started, count)
+        if self.interaction == INTERACTION_SCRIPT:
+            w.start('script', {'type': 'text/ecmascript'})
+            w.data(HOVER_SCRIPT % (json.dumps(list(EDGE_COLORS)),
+                                   length(12800)))
+            w.end('script')
+        w.end('svg')
+
+    def _render_meta(self, w):
         def safe(s):
             return s.replace('<', '&lt;').replace('>', '&gt;')
         if self.title is not None:
-            ET.SubElement(svg, 'title').text = safe(self.title)
+            w.start('title', {})
+            w.data(safe(self.title))
+            w.end('title')
         if self.comment is not None:
-            ET.SubElement(svg, 'desc').text = safe(self.comment)
+            w.start('desc', {})
+            w.data(safe(self.comment))
+            w.end('desc')
         comment = ' Created with nod2svg {0} '.format(self.VERSION)
-        svg.append(ET.Comment(comment))
+        w.comment(comment)
         if self.author is not None and len(self.author) > 0:
             author = ' Nodal authored by {0} '.format(self.author)
-            svg.append(ET.Comment(author))
-        self.generate_text_boxes(svg)
-        self.generate_edges(svg)
-        self.generate_nodes(svg)
-        self.mbr[0] -= GRID_TICK * 2
-        self.mbr[1] -= GRID_TICK * 2
-        self.mbr[2] += GRID_TICK * 2
-        self.mbr[3] += GRID_TICK * 2
-        t, l, w, h = self.mbr
-        w = abs(t) + abs(w)
-        h = abs(l) + abs(h)
-        svg.attrib['viewBox'] = '{0} {1} {2} {3}'.format(t, l, w, h)
-        return svg
+            w.comment(author)
+
+    def overview_level(self, cell_size):
+        """
+        Nodes & Edges clustered into cells at least ``cell_size`` wide.
+
+        Cells are :const:`~nod2svg.constants.GRID_TICK` times a power of
+        two, and levels are kept until :meth:`invalidate`. A level is
+        derived from a finer one when available, at a cost proportional
+        to the finer level's clusters, and only otherwise built from every
+        element.
+
+        :param cell_size: Smallest width of cells, in document units.
+        :type cell_size: :class:`numbers.Real`
+        :rtype: :class:`~nod2svg.lod.Level`
+
+        .. versionadded:: 0.2.0
+        """
+        depth = 0
+        while GRID_TICK << depth < cell_size:
+            depth += 1
+        levels = self._levels
+        if depth not in levels:
+            finer = [d for d in levels if d < depth]
+            if finer:
+                finest = max(finer)
+                levels[depth] = levels[finest].coarsen(1 << (depth - finest))
+            else:
+                levels[depth] = Level.build(self.nodes, self.edges,
+                                            GRID_TICK << depth)
+        return levels[depth]
+
+    def render_overview(self, w):
+        """
+        Emit a low detail overview of the document to writer ``w``, sized
+        :attr:`overview` pixels along its longest side.
+
+        Nodes within the same few pixels are drawn as one circle at their
+        mean position, and Edges between two such clusters as one line, in
+        a single path. At most four lines per pixel are drawn, keeping
+        those merging the most Edges. Markers & hover effects are left
+        out, and so are text boxes too small to read. Only clusters &
+        lines crossing the :attr:`region`, if any, are drawn, while
+        :attr:`seeds` are ignored. Clusters come from
+        :meth:`overview_level`, so once the document has been clustered,
+        the cost follows the size of the image rather than the number of
+        elements.
+
+        When instrumented, records an ``'overview'`` phase counting the
+        clusters & lines drawn.
+
+        :param w: The render target.
+        :type w: :class:`~nod2svg.writer.TreeWriter`
+        :raises: :class:`NodalException` for an :attr:`overview` that is
+                 not a positive number of pixels.
+
+        .. versionadded:: 0.2.0
+        """
+        pixels = self.overview
+        if not isinstance(pixels, numbers.Integral) or pixels < 1:
+            raise NodalException('Overview must be a positive number of '
+                                 'pixels, not {0!r}'.format(pixels))
+        length, _ = self._formatters()
+        if self.region is None:
+            x, y, width, height = self.bounds()
+        else:
+            x, y, width, height = self._region()
+        # Document units per pixel.
+        unit = max(width, height) / float(pixels)
+        svg_attr = {'xmlns': 'http://www.w3.org/2000/svg',
+                    'xmlns:xlink': 'http://www.w3.org/1999/xlink',
+                    'version': '1.1',
+                    'style': 'background:{};'.format(self.background_color),
+                    'viewBox': ' '.join(length(n)
+                                        for n in (x, y, width, height)),
+                    'width': '{0}'.format(int(round(width / unit))),
+                    'height': '{0}'.format(int(round(height / unit)))}
+        w.start('svg', svg_attr)
+        self._render_meta(w)
+        yield
+        started = timer()
+        level = self.overview_level(unit * OVERVIEW_CELL)
+        centers = level.centers()
+        # Pad the view by a cell, so clusters just outside still show.
+        margin = level.cell_size
+        view = (x - margin, y - margin, x + width + margin,
+                y + height + margin)
+        if TEXT_EXTENT / unit >= TEXT_MIN_PIXELS:
+            for _ in self.render_text_boxes(w):
+                yield
+        lines = []
+        for pair, merged in level.links.items():
+            ax, ay, _ = centers[pair[0]]
+            bx, by, _ = centers[pair[1]]
+            if intersects((min(ax, bx), min(ay, by), max(ax, bx),
+                           max(ay, by)), view):
+                lines.append((merged, ax, ay, bx, by))
+        budget = pixels * OVERVIEW_LINES
+        if len(lines) > budget:
+            lines = heapq.nlargest(budget, lines, key=lambda line: line[0])
+        data = ['M {0} {1} L {2} {3}'.format(length(ax), length(ay),
+                                             length(bx), length(by))
+                for _, ax, ay, bx, by in lines]
+        if data:
+            w.element('path', {'d': ' '.join(data),
+                               'fill': 'none',
+                               'stroke': self.edge_color,
+                               'stroke-opacity': self.edge_opacity_color,
+                               'stroke-width': length(max(6400, unit))})
+        yield
+        w.start('g', {'fill': self.node_fill_color,
+                      'fill-opacity': self.node_fill_opacity_color,
+                      'stroke': self.node_color,
+                      'stroke-opacity': self.node_opacity_color,
+                      'stroke-width': length(max(6400, unit / 2.0))})
+        radius = length(max(64000, unit))
+        count = len(data)
+        for cx, cy, _ in centers.values():
+            if view[0] <= cx <= view[2] and view[1] <= cy <= view[3]:
+                w.element('circle', {'cx': length(cx),
+                                     'cy': length(cy),
+                                     'r': radius})
+                count += 1
+        w.end('g')
+        yield
+        w.end('svg')
+        if self.instrument:
+            self._record('overview', started, count)
+
+    def style_sheet(self):
+        """
+        Build the CSS rules shared by all graphics when :attr:`stylesheet`
+        is set, and the Node hover rule for
+        :const:`~nod2svg.constants.INTERACTION_SCRIPT`.
+
+        :rtype: :class:`basestring`
+
+        .. versionadded:: 0.2.0
+        """
+        length, _ = self._formatters()
+        rules = ()
+        if self.stylesheet:
+            rules += self._style_rules(length)
+        if self.interaction == INTERACTION_SCRIPT:
+            rules += (('circle:hover',
+                       (('stroke-width', length(12800) + 'px'),)),)
+        return ''.join('{0}{{{1}}}'.format(selector,
+                                           ';'.join('{0}:{1}'.format(*d)
+                                                    for d in declarations))
+                       for selector, declarations in rules)
+
+    def _style_rules(self, length):
+        stroke_width = length(6400) + 'px'
+        dash_array = '{0}px {1}px'.format(length(32000), length(12800))
+        return (('.node', (('fill', self.node_fill_color),
+                           ('fill-opacity', self.node_fill_opacity_color),
+                           ('stroke', self.node_color),
+                           ('stroke-opacity', self.node_opacity_color),
+                           ('stroke-width', stroke_width))),
+                ('.glyph', (('stroke', self.node_color),
+                            ('stroke-opacity', self.node_opacity_color),
+                            ('stroke-width', stroke_width))),
+                ('.edge', (('fill', 'transparent'),
+                           ('stroke', self.edge_color),
+                           ('stroke-opacity', self.edge_opacity_color),
+                           ('stroke-width', stroke_width))),
+                ('.arrow', (('fill', self.edge_color),
+                            ('fill-opacity', self.edge_opacity_color))),
+                ('.dashed', (('stroke-dasharray', dash_array),)),
+                ('.annotation', (('stroke', self.annotation_color),
+                                 ('stroke-opacity',
+                                  self.annotation_opacity_color))))
+
+    def iterdump(self, xml_declaration=False, chunk_size=65536):
+        """
+        Generate an SVG document as a series of :class:`bytes` chunks,
+        serializing each graphic element as it is rendered instead of
+        building a DOM tree first.
+
+        Joined together, the chunks equal :meth:`dumps`. The first chunk is
+        produced as soon as the document header is rendered.
+
+        :param xml_declaration: Start with an XML declaration.
+                                Default=``False``
+        :type xml_declaration: :class:`bool`
+        :param chunk_size: Approximate size of chunks. Default=``65536``
+        :type chunk_size: :class:`numbers.Integral`
+        :rtype: :class:`collections.Iterator`
+
+        When instrumented, also records a ``'serialize'`` phase counting
+        bytes output.
+
+        .. versionadded:: 0.2.0
+        """
+        started = timer()
+        size = 0
+        w = StreamWriter()
+        steps = self.render(w)
+        # Render the header before any output, so bad options fail early.
+        next(steps)
+        if xml_declaration:
+            size += len(XML_DECLARATION)
+            yield XML_DECLARATION
+        chunk = w.take()
+        size += len(chunk)
+        yield chunk
+        for _ in steps:
+            if w.size >= chunk_size:
+                chunk = w.take()
+                size += len(chunk)
+                yield chunk
+        chunk = w.close()
+        size += len(chunk)
+        yield chunk
+        if self.instrument:
+            self._record('serialize', started, size)
+
+    def stream(self, fd, xml_declaration=True, compression=COMPRESSION_NONE):
+        """
+        Write an SVG document to a binary file-like object while it is
+        being generated. See :meth:`iterdump`.
+
+        :param fd: Writable binary file-like object.
+        :type fd: :class:`io.BufferedIOBase`
+        :param xml_declaration: Start with an XML declaration.
+                                Default=``True``
+        :type xml_declaration: :class:`bool`
+        :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+                            Default=``'none'``
+        :type compression: :class:`basestring`
+        :raises: :class:`ValueError` for unknown or unavailable codecs.
+
+        .. versionadded:: 0.2.0
+        """
+        chunks = self.iterdump(xml_declaration=xml_declaration)
+        for chunk in compress(chunks, compression):
+            fd.write(chunk)
+
+    def dump_tiles(self, directory, columns, rows, compression=None):
+        """
+        Write the image as a grid of ``columns`` by ``rows`` SVG tiles into
+        ``directory``, with a JSON manifest, so that viewers can fetch only
+        the tiles in view.
+
+        Tiles divide :meth:`bounds`, and each is rendered as a
+        :attr:`region`, holding only the elements crossing it. Tiles are
+        named like ``tile_0_1.svg`` for row 0 & column 1, and listed in
+        ``tiles.json`` with their regions & element counts.
+
+        :param directory: Where to write tiles. Created if missing.
+        :type directory: :class:`basestring`
+        :param columns: Number of tiles across.
+        :type columns: :class:`numbers.Integral`
+        :param rows: Number of tiles down.
+        :type rows: :class:`numbers.Integral`
+        :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+                            Default=``'none'``
+        :type compression: :class:`basestring`
+        :returns: The manifest.
+        :rtype: :class:`dict`
+        :raises: :class:`ValueError` for unknown or unavailable codecs.
+
+        .. versionadded:: 0.2.0
+        """
+        if columns < 1 or rows < 1:
+            raise NodalException('Tiles need at least one row & column')
+        if compression is None:
+            compression = COMPRESSION_NONE
+        elif compression not in COMPRESSIONS:
+            raise ValueError('Unknown compression {0!r}'.format(compression))
+        suffix = compression_suffix(compression)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        x, y, width, height = self.bounds()
+        tile_width = width / float(columns)
+        tile_height = height / float(rows)
+        tiles = []
+        region = self.region
+        try:
+            for row in range(rows):
+                for column in range(columns):
+                    self.region = (x + column * tile_width,
+                                   y + row * tile_height,
+                                   tile_width,
+                                   tile_height)
+                    name = TILE_FORMAT.format(row=row,
+                                              column=column) + suffix
+                    self.dump(os.path.join(directory, name), compression)
+                    tiles.append({'row': row,
+                                  'column': column,
+                                  'region': list(self.region),
+                                  'path': name,
+                                  'elements': len(self._selection())})
+        finally:
+            self.region = region
+        manifest = {'version': self.VERSION,
+                    'columns': columns,
+                    'rows': rows,
+                    'bounds': [x, y, width, height],
+                    'tile_size': [tile_width, tile_height],
+                    'tiles': tiles}
+        with open(os.path.join(directory, TILES_MANIFEST), 'w') as fd:
+            json.dump(manifest, fd, indent=2, sort_keys=True)
+        return manifest
 
     def path_vertical(self, start, end):
         """
@@ -540,16 +1899,11 @@ class NodalImage(object):
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Computed by :func:`nod2svg.geometry.vertical`.
         """
-        if start[Y] > end[Y]:
-            start_y = start[Y] - 64000
-        else:
-            start_y = start[Y] + 64000
-        if end[Y] > start[Y]:
-            end_y = end[Y] - 70400
-        else:
-            end_y = end[Y] + 70400
-        return 'M {0} {1} V {2}'.format(start[X], start_y, end_y)
+        return format_path(geometry.vertical(start[X], start[Y],
+                                             end[X], end[Y]))
 
     def path_horizontal(self, start, end):
         """
@@ -562,16 +1916,11 @@ class NodalImage(object):
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Computed by :func:`nod2svg.geometry.horizontal`.
         """
-        if start[X] > end[X]:
-            start_x = start[X] - 64000
-        else:
-            start_x = start[X] + 64000
-        if end[X] > start[X]:
-            end_x = end[X] - 70400
-        else:
-            end_x = end[X] + 70400
-        return 'M {0} {1} H {2}'.format(start_x, start[Y], end_x)
+        return format_path(geometry.horizontal(start[X], start[Y],
+                                               end[X], end[Y]))
 
     def path_city_block(self, start, end):
         """
@@ -584,25 +1933,11 @@ class NodalImage(object):
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Computed by :func:`nod2svg.geometry.city_block`.
         """
-        if start[X] == end[X]:
-            path = self.path_vertical(start, end)
-        elif start[Y] == end[Y]:
-            path = self.path_horizontal(start, end)
-        else:
-            if end[Y] > start[Y]:
-                end_y = end[Y] - 70400
-            else:
-                end_y = end[Y] + 70400
-            if start[X] > end[X]:
-                start_x = start[X] - 64000
-            else:
-                start_x = start[X] + 64000
-            path = "M {0} {1} H {2} V {3}".format(start_x,
-                                                  start[Y],
-                                                  end[X],
-                                                  end_y)
-        return path
+        return format_path(geometry.city_block(start[X], start[Y],
+                                               end[X], end[Y]))
 
     def path_city_block_flipped(self, start, end):
         """
@@ -615,25 +1950,11 @@ class NodalImage(object):
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Computed by :func:`nod2svg.geometry.city_block_flipped`.
         """
-        if start[X] == end[X]:
-            path = self.path_vertical(start, end)
-        elif start[Y] == end[Y]:
-            path = self.path_horizontal(start, end)
-        else:
-            if start[Y] > end[Y]:
-                start_y = start[Y] - 64000
-            else:
-                start_y = start[Y] + 64000
-            if end[X] > start[X]:
-                end_x = end[X] - 70400
-            else:
-                end_x = end[X] + 70400
-            path = "M {0} {1} V {2} H {3}".format(start[X],
-                                                  start_y,
-                                                  end[Y],
-                                                  end_x)
-        return path
+        return format_path(geometry.city_block_flipped(start[X], start[Y],
+                                                       end[X], end[Y]))
 
     def path_direct(self, start, end):
         """
@@ -646,39 +1967,348 @@ class NodalImage(object):
         :rtype: :class:`basestring`
 
         .. versionadded:: 0.1.0
+        .. versionchanged:: 0.2.0
+           Computed by :func:`nod2svg.geometry.direct`.
         """
-        dy = end[Y] - start[Y]
-        dx = end[X] - start[X]
-        theta = math.atan2(-dy, -dx)
-        theta %= 2 * math.pi
-        theta_cos = math.cos(theta)
-        theta_sin = math.sin(theta)
-        end_x = end[X] + 70400 * theta_cos
-        end_y = end[Y] + 70400 * theta_sin
-        start_x = start[X] - 64000 * theta_cos
-        start_y = start[Y] - 64000 * theta_sin
-        return "M {0} {1} L {2} {3}".format(start_x,
-                                            start_y,
-                                            end_x,
-                                            end_y)
-
-
-def main():
+        return format_path(geometry.direct(start[X], start[Y],
+                                           end[X], end[Y]))
+
+
+def _create_temporary(path):
+    """
+    Create a file beside ``path`` to write it into, with the permissions
+    :func:`open` would give ``path``. Returns the open file & its path.
+    """
+    directory, name = os.path.split(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temporary = os.path.join(directory, '.{0}.{1}.{2:08x}.tmp'.format(
+            name, os.getpid(), random.getrandbits(32)))
+        try:
+            descriptor = os.open(temporary, flags, 0o666)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+        else:
+            return os.fdopen(descriptor, 'wb'), temporary
+
+
+def region_box(text):
+    """
+    Parse a :attr:`~NodalImage.region` from the command line, as four
+    numbers ``X,Y,WIDTH,HEIGHT`` in document units.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`tuple`
+    :raises: :class:`ValueError` when not four numbers, or not a positive
+             size.
+
+    .. versionadded:: 0.2.0
+    """
+    values = []
+    for part in text.replace(',', ' ').split():
+        value = float(part)
+        values.append(int(value) if value.is_integer() else value)
+    if len(values) != 4 or values[2] <= 0 or values[3] <= 0:
+        raise ValueError(text)
+    return tuple(values)
+
+
+def tile_grid(text):
+    """
+    Parse a tile grid from the command line, as ``COLUMNSxROWS``.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`tuple`
+    :raises: :class:`ValueError` when not two positive integers.
+
+    .. versionadded:: 0.2.0
+    """
+    columns, rows = (int(n) for n in text.lower().split('x'))
+    if columns < 1 or rows < 1:
+        raise ValueError(text)
+    return columns, rows
+
+
+def scale_factor(text):
+    """
+    Parse a :attr:`~NodalImage.scale` from the command line. Either a
+    positive number, or ``'grid'`` for
+    :const:`~nod2svg.constants.GRID_TICK`.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`numbers.Real`
+    :raises: :class:`ValueError` when not a positive number.
+
+    .. versionadded:: 0.2.0
+    """
+    if text.lower() == 'grid':
+        return GRID_TICK
+    value = float(text)
+    if value <= 0:
+        raise ValueError(text)
+    return value
+
+
+def decimal_places(text):
+    """
+    Parse a :attr:`~NodalImage.precision` from the command line.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`numbers.Integral`
+    :raises: :class:`ValueError` when not a whole number.
+
+    .. versionadded:: 0.2.0
+    """
+    value = int(text)
+    if value < 0:
+        raise ValueError(text)
+    return value
+
+
+def overview_pixels(text):
+    """
+    Parse an :attr:`~NodalImage.overview` size from the command line.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`numbers.Integral`
+    :raises: :class:`ValueError` when not a positive integer.
+
+    .. versionadded:: 0.2.0
+    """
+    value = int(text)
+    if value < 1:
+        raise ValueError(text)
+    return value
+
+
+def hop_limit(text):
+    """
+    Parse a :attr:`~NodalImage.hops` limit from the command line.
+
+    :param text: Command line argument.
+    :type text: :class:`basestring`
+    :rtype: :class:`numbers.Integral`
+    :raises: :class:`ValueError` when not a whole number.
+
+    .. versionadded:: 0.2.0
+    """
+    value = int(text)
+    if value < 0:
+        raise ValueError(text)
+    return value
+
+
+def main(argv=None):
     """
     Entry point for console script.
 
+    :param argv: Command line arguments. Defaults to ``sys.argv[1:]``
+    :type argv: :class:`list`
+    :returns: Exit status.
+    :rtype: :class:`numbers.Integral`
+
     .. versionadded:: 0.1.0
     .. versionchanged:: 0.1.2
        Simplified banner, and sent to stderr.
+    .. versionchanged:: 0.2.0
+       Added batch mode with ``-o DIRECTORY`` & ``-j N`` options,
+       ``--stylesheet``, ``--interaction``, ``--scale``, ``--precision``,
+       ``--region``, ``--overview``, ``--seed``, ``--hops`` &
+       ``--annotations`` render options, ``--tiles``, ``--compression``,
+       ``--cache-dir`` & ``--cache-size`` render caching,
+       ``--incremental`` rebuilds, ``--watch`` mode, ``--serve`` &
+       ``--host`` render service, ``--stats`` instrumentation, and
+       ``--inspect`` document statistics.
     """
+    import argparse
     import sys
-    options = sys.argv[1:]
+    parser = argparse.ArgumentParser(prog='nod2svg')
+    parser.add_argument('paths', nargs='*', metavar='FILEPATH')
+    parser.add_argument('-o', '--output-dir', metavar='DIRECTORY',
+                        help='batch convert all FILEPATHs, and directories '
+                             'of .nod documents, into DIRECTORY')
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='number of batch worker processes')
+    parser.add_argument('--stylesheet', action='store_true',
+                        help='style graphics from one shared CSS sheet')
+    parser.add_argument('--interaction', choices=INTERACTIONS,
+                        help='mouseover effects from SMIL animations '
+                             '(default), one embedded script, or none')
+    parser.add_argument('--scale', type=scale_factor, metavar='FACTOR',
+                        help='divide coordinates by FACTOR, or by the grid '
+                             'tick with "grid", and write compact paths')
+    parser.add_argument('--precision', type=decimal_places, metavar='N',
+                        help='round coordinates to N decimal places, and '
+                             'write compact paths')
+    parser.add_argument('--region', type=region_box,
+                        metavar='X,Y,WIDTH,HEIGHT',
+                        help='render only the elements crossing this '
+                             'rectangle, in document units')
+    parser.add_argument('--seed', action='append', metavar='KEY',
+                        help='render only what is reachable from the Node '
+                             'KEY; may be repeated')
+    parser.add_argument('--hops', type=hop_limit, metavar='K',
+                        help='with --seed, follow at most K Edges')
+    parser.add_argument('--overview', type=overview_pixels,
+                        metavar='PIXELS',
+                        help='draw a quick, low detail overview PIXELS '
+                             'across, clustering nearby Nodes')
+    parser.add_argument('--annotations', choices=ANNOTATIONS,
+                        help='parse text box HTML, inline it unchecked, or '
+                             'leave text boxes out')
+    parser.add_argument('--tiles', type=tile_grid, metavar='COLUMNSxROWS',
+                        help='write a grid of tiles & a manifest into the '
+                             'directory given as the second FILEPATH')
+    parser.add_argument('--compression', choices=COMPRESSIONS,
+                        help='compress output; by default chosen from the '
+                             'output extension, such as .svgz')
+    parser.add_argument('--cache-dir', metavar='DIRECTORY',
+                        help='copy unchanged images from a render cache in '
+                             'DIRECTORY, when writing to files')
+    parser.add_argument('--cache-size', type=int, metavar='MB',
+                        help='evict least recently used images beyond MB '
+                             'megabytes of render cache')
+    parser.add_argument('--incremental', action='store_true',
+                        help='with -o, only convert documents changed since '
+                             'the last run')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running, and convert documents again '
+                             'whenever they are saved')
+    parser.add_argument('--interval', type=float, default=0.02,
+                        metavar='SECONDS',
+                        help='seconds between checks for changes when '
+                             'watching, so a save is noticed within this '
+                             'long')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='run an HTTP render service on PORT')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address the render service listens on')
+    parser.add_argument('--stats', action='store_true',
+                        help='write phase durations & counts to stderr as '
+                             'JSON lines')
+    parser.add_argument('--inspect', action='store_true',
+                        help='write statistics of all FILEPATHs, and '
+                             'directories of .nod documents, to stdout as '
+                             'JSON lines, without rendering')
+    args = parser.parse_args(argv)
+    options = {}
+    if args.stylesheet:
+        options['stylesheet'] = True
+    if args.interaction is not None:
+        options['interaction'] = args.interaction
+    if args.annotations is not None:
+        options['annotations'] = args.annotations
+    for name in ('scale', 'precision', 'region', 'overview', 'hops'):
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    if args.seed:
+        options['seeds'] = tuple(args.seed)
+    cache_size = None
+    if args.cache_size is not None:
+        cache_size = args.cache_size * 1024 * 1024
+    suffix = compression_suffix(args.compression or COMPRESSION_NONE)
+
+    def report(result):
+        """Describe a batch result on stderr, and return its status."""
+        if result.skipped:
+            return 0
+        if args.stats and result.stats is not None:
+            sys.stderr.write(json.dumps({'source': result.source,
+                                         'stats': result.stats}) + '\n')
+        if result.error is None:
+            arrow = '=>' if result.cached else '->'
+            sys.stderr.write('{0} {1} {2}\n'.format(result.source, arrow,
+                                                    result.destination))
+            return 0
+        sys.stderr.write('{0} !! {1}\n'.format(result.source, result.error))
+        return 1
+    if args.serve is not None:
+        from .server import serve
+        sys.stderr.write('Serving on http://{0}:{1}/\n'.format(args.host,
+                                                              args.serve))
+        serve(args.host, args.serve, threads=args.jobs or 4, **options)
+        return 0
+    if args.inspect and args.paths:
+        from .stats import inspect_batch
+        status = 0
+        for result in inspect_batch(args.paths, processes=args.jobs):
+            if result.error is None:
+                line = dict(result.stats, source=result.source)
+            else:
+                line = {'source': result.source, 'error': result.error}
+                status = 1
+            sys.stdout.write(json.dumps(line, sort_keys=True) + '\n')
+        return status
+    if args.watch and (args.output_dir is not None or len(args.paths) == 2):
+        from .watch import Watcher
+        if args.output_dir is not None:
+            watcher = Watcher(args.paths, args.output_dir, suffix=suffix)
+        else:
+            watcher = Watcher(jobs=[tuple(args.paths)])
+        watcher.interval = args.interval
+        watcher.options = dict(options,
+                               instrument=args.stats,
+                               cache_dir=args.cache_dir,
+                               cache_size=cache_size)
+        try:
+            watcher.run(report)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.output_dir is not None and args.paths:
+        from .batch import convert_batch
+        status = 0
+        for result in convert_batch(args.paths,
+                                    args.output_dir,
+                                    processes=args.jobs,
+                                    suffix=suffix,
+                                    instrument=args.stats,
+                                    cache_dir=args.cache_dir,
+                                    cache_size=cache_size,
+                                    incremental=args.incremental,
+                                    **options):
+            status |= report(result)
+        return status
     try:
-        nod = NodalImage(options[0])
-        if len(options) == 2:
-            nod.dump(options[1])
+        if len(args.paths) > 2:
+            raise IndexError(args.paths)
+        source = args.paths[0]
+        nod = NodalImage(instrument=args.stats, **options)
+        if args.tiles is not None:
+            if len(args.paths) != 2:
+                raise IndexError(args.paths)
+            nod.load(source)
+            nod.dump_tiles(args.paths[1], *args.tiles,
+                           compression=args.compression)
+        elif len(args.paths) == 2 and (args.cache_dir is not None or
+                                     cache_size is not None):
+            from .cache import RenderCache
+            cache = RenderCache(args.cache_dir, cache_size)
+            cache.convert(nod, source, args.paths[1],
+                          compression=args.compression)
+        elif len(args.paths) == 2:
+            nod.load(source)
+            nod.dump(args.paths[1], compression=args.compression)
         else:
-            sys.stdout.write(nod.dumps().decode() + '\n')
+            nod.load(source)
+            stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+            if args.compression in (None, COMPRESSION_NONE):
+                nod.stream(stdout, xml_declaration=False)
+                stdout.write(b'\n')
+            else:
+                nod.stream(stdout, compression=args.compression)
+        if args.stats:
+            sys.stderr.write(json.dumps({'source': source,
+                                         'stats': nod.stats}) + '\n')
+    except NodalException as err:
+        sys.stderr.write('{0} !! {1}\n'.format(source, err))
+        return 1
     except IndexError:
         msg = ('',
                ' nod2svg {0} by emcconville',
@@ -687,10 +2317,17 @@ def main():
                '',
                ' Usage:',
                '       nod2svg FILEPATH [FILEPATH]',
+               '       nod2svg --tiles COLUMNSxROWS FILEPATH DIRECTORY',
+               '       nod2svg -o DIRECTORY [-j N] FILEPATH [FILEPATH ...]',
+               '       nod2svg --inspect [-j N] FILEPATH [FILEPATH ...]',
+               '       nod2svg --watch FILEPATH FILEPATH',
+               '       nod2svg --watch -o DIRECTORY FILEPATH [FILEPATH ...]',
+               '       nod2svg --serve PORT [--host ADDRESS] [-j N]',
                '',
                '')
         sys.stderr.write('\n'.join(msg).format(VERSION))
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+""":mod:`nod2svg.markup` --- Text box markup
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Text boxes hold HTML, which is placed in each box's ``<foreignObject>``.
+Documents often repeat the same annotation, so parsed markup is kept in a
+least recently used cache keyed by the text itself, and serialized at most
+once::
+
+    from nod2svg.markup import markup_cache
+
+    markup = markup_cache.markup('<div><p>Verse</p></div>')
+    markup.text     # '<div xmlns="http://www.w3.org/1999/xhtml">...'
+    markup.element  # The parsed root element.
+
+Markup known to be well formed may instead be inlined as it is with
+:meth:`Markup.inline`, which parses nothing unless an element tree is
+asked for.
+
+.. versionadded:: 0.2.0
+"""
+import copy
+import re
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from .lru import LRUCache
+from .writer import localize, tostring
+
+__all__ = ('MARKUP_CACHE_SIZE',
+           'Markup',
+           'MarkupCache',
+           'XHTML_NAMESPACE',
+           'markup_cache')
+
+XHTML_NAMESPACE = 'http://www.w3.org/1999/xhtml'
+#: Number of distinct text box texts kept by :data:`markup_cache`.
+MARKUP_CACHE_SIZE = 1024
+# The root tag's name after any leading whitespace, and its attributes.
+ROOT_TAG = re.compile(r'\s*<[^\s/>!?]+'
+                      r'((?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)')
+# Names of the root tag's attributes.
+ATTRIBUTE = re.compile(r'\s+([^\s=/>]+)\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+
+
+class Markup(object):
+    """
+    The HTML of a text box, as an element and as serialized text. Either
+    is derived from the other when first needed.
+
+    :param source: The text box's text.
+    :type source: :class:`basestring`
+    :param element: The parsed root element, with its namespace set.
+    :type element: :class:`xml.etree.cElementTree.Element`
+    :param text: The serialized markup, with its namespace set.
+    :type text: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    __slots__ = ('source', '_element', '_text')
+
+    def __init__(self, source, element=None, text=None):
+        self.source = source
+        self._element = element
+        self._text = text
+
+    @classmethod
+    def parse(cls, source):
+        """
+        Parse a text box's text. Namespaces other than XHTML are declared
+        on the root element, as by :func:`~nod2svg.writer.localize`.
+
+        :param source: The text box's text.
+        :type source: :class:`basestring`
+        :rtype: :class:`Markup`
+        :raises: :class:`xml.etree.cElementTree.ParseError` for malformed
+                 markup.
+        """
+        element = localize(ET.fromstring(source), {XHTML_NAMESPACE: ''})
+        element.attrib['xmlns'] = XHTML_NAMESPACE
+        return cls(source, element=element)
+
+    @classmethod
+    def inline(cls, source):
+        """
+        Use a text box's text as it is, only declaring the namespace of
+        its root element when it doesn't declare one itself. Nothing is
+        parsed or validated, so the text must be a single well formed
+        element.
+
+        :param source: The text box's text.
+        :type source: :class:`basestring`
+        :rtype: :class:`Markup`
+        :raises: :class:`ValueError` when the text doesn't start with a
+                 tag.
+        """
+        match = ROOT_TAG.match(source)
+        if match is None:
+            raise ValueError('Not markup: {0!r}'.format(source[:40]))
+        if 'xmlns' in ATTRIBUTE.findall(match.group(1)):
+            return cls(source, text=source)
+        end = match.start(1)
+        text = '{0} xmlns="{1}"{2}'.format(source[:end], XHTML_NAMESPACE,
+                                            source[end:])
+        return cls(source, text=text)
+
+    @property
+    def element(self):
+        """(:class:`xml.etree.cElementTree.Element`)
+        The parsed root element. Shared, so copy it before changing it.
+        """
+        if self._element is None:
+            self._element = Markup.parse(self.source)._element
+        return self._element
+
+    @property
+    def text(self):
+        """(:class:`basestring`)
+        The serialized markup, as :func:`~nod2svg.writer.tostring` writes
+        :attr:`element`.
+        """
+        if self._text is None:
+            self._text = tostring(self.element)
+        return self._text
+
+    def copy(self):
+        """
+        A copy of :attr:`element`, free to be changed or attached to a
+        tree.
+
+        :rtype: :class:`xml.etree.cElementTree.Element`
+        """
+        return copy.deepcopy(self.element)
+
+
+class MarkupCache(LRUCache):
+    """
+    Parsed :class:`Markup` by text box text, keeping at most ``maxsize``.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, maxsize=MARKUP_CACHE_SIZE):
+        LRUCache.__init__(self, maxsize)
+
+    def markup(self, source):
+        """
+        The parsed markup of a text box's text, from the cache when seen
+        recently.
+
+        :param source: The text box's text.
+        :type source: :class:`basestring`
+        :rtype: :class:`Markup`
+        :raises: :class:`xml.etree.cElementTree.ParseError` for malformed
+                 markup.
+        """
+        markup = self.get(source)
+        if markup is None:
+            markup = Markup.parse(source)
+            self.put(source, markup)
+        return markup
+
+
+#: Cache shared by every :class:`~nod2svg.main.NodalImage`.
+markup_cache = MarkupCache()
@@ -0,0 +1,235 @@
+""":mod:`nod2svg.parser` --- Nodal document parser
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reads XML & binary property list Nodal documents, keeping only the fields
+needed to render them.
+
+XML documents are fed in blocks to an :class:`~xml.etree.ElementTree.XMLParser`
+whose target builds values directly, so no element tree is ever held. Text
+of unwanted fields is neither collected nor converted, and memory holds
+little more than the fields kept. Binary documents are read with
+:func:`plistlib.load`, and then filtered the same way.
+
+.. versionadded:: 0.2.0
+"""
+import base64
+import datetime
+import io
+import plistlib
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from .constants import *
+
+__all__ = ('DOCUMENT_FIELDS',
+           'ELEMENT_FIELDS',
+           'parse')
+
+#: Element fields read by :class:`~nod2svg.main.NodalImage`.
+ELEMENT_FIELDS = (TYPE, TICKPOS, FROM_NODE, TO_NODE, PATH, WORMHOLE,
+                  DONT_PLAY_NOTE, SIGNALLING_METHOD, TEXT)
+#: Top level document fields read by :class:`~nod2svg.main.NodalImage`.
+DOCUMENT_FIELDS = (AUTHOR, TITLE, COMMENT, STYLE_BACKGROUND_COLOR,
+                   STYLE_ANNOTATION_COLOR)
+
+BINARY_HEADER = b'bplist00'
+# Size of blocks fed to the XML parser.
+BLOCK_SIZE = 1 << 16
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+CONTAINERS = ('dict', 'array')
+
+
+def _schema(fields):
+    """
+    Describe which values to keep. ``True`` keeps a value whole, and a
+    dictionary keeps the listed keys of a dictionary, with ``'*'``
+    matching any key.
+    """
+    if fields is None:
+        return True
+    schema = dict((name, True) for name in DOCUMENT_FIELDS)
+    schema[ELEMENTS] = {'*': dict((name, True) for name in fields)}
+    return schema
+
+
+def _child(schema, key):
+    if schema is True or schema is None:
+        return schema
+    return schema.get(key, schema.get('*'))
+
+
+def _element_schema(schema):
+    # The schema of each element, marking where to apply a factory.
+    if schema is True:
+        return None
+    return schema[ELEMENTS]['*']
+
+
+def _filter(value, schema, factory=None, element=None):
+    if schema is True:
+        return value
+    if not isinstance(value, dict):
+        # A plain value where a dictionary was expected; keep it so it is
+        # reported as it is.
+        return value
+    kept = {}
+    for key in value:
+        child = _child(schema, key)
+        if child is not None:
+            kept[key] = _filter(value[key], child, factory, element)
+    if schema is element and factory:
+        return factory(kept)
+    return kept
+
+
+def _scalar(tag, text):
+    if tag == 'string':
+        return text
+    elif tag == 'integer':
+        return int(text)
+    elif tag == 'real':
+        return float(text)
+    elif tag == 'true':
+        return True
+    elif tag == 'false':
+        return False
+    elif tag == 'data':
+        return base64.b64decode(text.encode('ascii'))
+    elif tag == 'date':
+        return datetime.datetime.strptime(text, DATE_FORMAT)
+    raise ValueError('Unknown property list type {0!r}'.format(tag))
+
+
+class _Builder(object):
+    """
+    :class:`xml.etree.ElementTree.XMLParser` target building only the
+    wanted values of a property list, without building any elements.
+    """
+
+    def __init__(self, schema, factory=None):
+        self.schema = schema
+        self.factory = factory
+        self.element = _element_schema(schema)
+        # Each frame is [container, schema, pending key]. Skipped
+        # containers have neither container nor schema.
+        self.stack = []
+        self.root = None
+        self.found = False
+        # Text of the current key or wanted value, else None.
+        self.text = None
+
+    def _wanted(self):
+        if not self.stack:
+            return self.schema
+        container, schema, key = self.stack[-1]
+        if schema is None or schema is True:
+            return schema
+        elif isinstance(container, list):
+            return None
+        return schema.get(key, schema.get('*'))
+
+    def start(self, tag, attrib):
+        if tag in CONTAINERS:
+            wanted = self._wanted()
+            if wanted is None:
+                container = None
+            elif tag == 'dict':
+                container = {}
+            else:
+                container = []
+            self.stack.append([container, wanted, None])
+            self.text = None
+        elif tag == 'key' or (tag != 'plist' and
+                              self._wanted() is not None):
+            self.text = []
+        else:
+            self.text = None
+
+    def data(self, text):
+        if self.text is not None:
+            self.text.append(text)
+
+    def end(self, tag):
+        if tag == 'plist':
+            return
+        elif tag == 'key':
+            if self.stack:
+                self.stack[-1][2] = ''.join(self.text)
+            self.text = None
+            return
+        if tag in CONTAINERS:
+            value, wanted, _ = self.stack.pop()
+            keep = wanted is not None
+            if keep and wanted is self.element and self.factory:
+                value = self.factory(value)
+        else:
+            keep = self.text is not None
+            value = _scalar(tag, ''.join(self.text)) if keep else None
+            self.text = None
+        if not self.stack:
+            self.root = value
+            self.found = True
+            return
+        parent = self.stack[-1]
+        if keep and parent[0] is not None:
+            if isinstance(parent[0], list):
+                parent[0].append(value)
+            else:
+                parent[0][parent[2]] = value
+        parent[2] = None
+
+    def close(self):
+        if not self.found:
+            raise ValueError('Not a property list')
+        return self.root
+
+
+def parse(fd, fields=ELEMENT_FIELDS, factory=None):
+    """
+    Parse a Nodal document.
+
+    :param fd: Readable binary file-like object, which need not be
+               seekable.
+    :type fd: :class:`io.BufferedIOBase`
+    :param fields: Element fields to keep, besides
+                   :const:`DOCUMENT_FIELDS`. ``None`` keeps the whole
+                   document.
+    :type fields: :class:`collections.Iterable`
+    :param factory: Optional function called with each element's
+                    dictionary as soon as it is read, returning what to
+                    keep in its place, such as
+                    :func:`nod2svg.records.record`. Ignored when keeping
+                    the whole document.
+    :type factory: :class:`collections.Callable`
+    :returns: The document's top level dictionary.
+    :rtype: :class:`dict`
+    :raises: :class:`ValueError` for malformed documents, and unsupported
+             binary documents.
+    """
+    schema = _schema(fields)
+    # Sniffed without seeking, so streams that can't seek are read too.
+    header = fd.read(len(BINARY_HEADER))
+    if header == BINARY_HEADER:
+        if not hasattr(plistlib, 'loads'):
+            raise ValueError('Binary property lists need Python 3.4+')
+        # Binary property lists are read by offset, so streams that can't
+        # seek are read whole.
+        if getattr(fd, 'seekable', lambda: False)():
+            fd.seek(-len(header), io.SEEK_CUR)
+            nod = plistlib.load(fd)
+        else:
+            nod = plistlib.loads(header + fd.read())
+        return _filter(nod, schema, factory, _element_schema(schema))
+    builder = _Builder(schema, factory)
+    xml_parser = ET.XMLParser(target=builder)
+    try:
+        xml_parser.feed(header)
+        for block in iter(lambda: fd.read(BLOCK_SIZE), b''):
+            xml_parser.feed(block)
+        return xml_parser.close()
+    except SyntaxError as err:
+        # ElementTree's ParseError.
+        raise ValueError('Malformed property list: {0}'.format(err))
@@ -0,0 +1,272 @@
+""":mod:`nod2svg.records` --- Compact element records
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Nodes, Edges, and text boxes are held as records with ``__slots__``,
+rather than as the property list dictionaries they were read from. A record
+keeps only the fields needed to render, in plain attributes, and shares
+repeated strings. Each record is also a mutable mapping of its property
+list fields, so existing code reading ``node[TICKPOS]`` or
+``edge[FROM_NODE]`` keeps working::
+
+    node = image.nodes['1']
+    node.x, node.y           # Rendering reads attributes,
+    node[X], node[TICKPOS]   # and anything else may still use keys.
+
+Fields of other elements, and any extra fields of a record, are kept in a
+dictionary of their own.
+
+.. versionadded:: 0.2.0
+"""
+import sys
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from .constants import *
+
+__all__ = ('Edge',
+           'Node',
+           'Record',
+           'TextBox',
+           'record')
+
+try:
+    intern = sys.intern
+except AttributeError:
+    # Python 2, where intern is a builtin.
+    pass
+
+
+def parse_tick_position(value):
+    """
+    Convert a Nodal coordinate string into integers::
+
+        "{x, y}" => (x, y)
+
+    :param value: The Nodal coordinate string.
+    :type value: :class:`basestring`
+    :rtype: :class:`tuple`
+
+    .. versionadded:: 0.2.0
+    """
+    x, y = value.lstrip('{').rstrip('}').split(', ')
+    return int(x), int(y)
+
+
+def _shared(value):
+    # Type names, path shapes & signalling methods repeat throughout a
+    # document, so keep one copy of each.
+    if isinstance(value, str):
+        return intern(value)
+    return value
+
+
+class Record(MutableMapping):
+    """
+    Base of element records. A record is a mapping of property list fields,
+    with the fields listed in :attr:`FIELDS` kept in slots, and all others
+    in :attr:`extra`. Fields are missing while their slot is ``None``, as
+    property lists have no null value.
+
+    :param fields: Property list fields of the element.
+    :type fields: :class:`collections.Mapping`
+    """
+    __slots__ = ('number', 'extra')
+    #: The :const:`~nod2svg.constants.TYPE` of every record of the class.
+    KIND = None
+    #: Map of property list fields to the slots keeping them.
+    FIELDS = {}
+
+    def __init__(self, fields=()):
+        #: Position among elements of the same type, numbering the DOM ID.
+        #: Assigned by :meth:`~nod2svg.main.NodalImage.index_elements`.
+        self.number = None
+        #: Other fields, or ``None`` when there are none.
+        self.extra = None
+        slots = self.FIELDS
+        for slot in slots.values():
+            setattr(self, slot, None)
+        for key in fields:
+            slot = slots.get(key)
+            if slot is None:
+                self[key] = fields[key]
+            else:
+                setattr(self, slot, _shared(fields[key]))
+
+    @property
+    def dom_id(self):
+        """(:class:`basestring`)
+        The DOM ID of the element's graphic, or ``None`` until indexed.
+        """
+        if self.extra is not None and DOM_ID in self.extra:
+            return self.extra[DOM_ID]
+        elif self.number is None:
+            return None
+        return ID_FORMAT.format(self.KIND, self.number)
+
+    def __getitem__(self, key):
+        if key == TYPE:
+            return self.KIND
+        elif key == DOM_ID:
+            value = self.dom_id
+        elif key in self.FIELDS:
+            value = getattr(self, self.FIELDS[key])
+        elif self.extra is not None:
+            return self.extra[key]
+        else:
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == TYPE:
+            if value != self.KIND:
+                raise ValueError('Can not change a {0} into a {1!r}'.format(
+                    self.KIND, value))
+        elif key in self.FIELDS:
+            setattr(self, self.FIELDS[key], _shared(value))
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key == TYPE:
+            raise KeyError('Can not delete the type of a record')
+        elif key == DOM_ID and self.number is not None:
+            self.number = None
+            if self.extra is not None:
+                self.extra.pop(DOM_ID, None)
+        elif key in self.FIELDS:
+            if getattr(self, self.FIELDS[key]) is None:
+                raise KeyError(key)
+            setattr(self, self.FIELDS[key], None)
+        elif self.extra is not None:
+            del self.extra[key]
+            if not self.extra:
+                self.extra = None
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        yield TYPE
+        for key in self.FIELDS:
+            if getattr(self, self.FIELDS[key]) is not None:
+                yield key
+        if self.extra is not None:
+            for key in self.extra:
+                yield key
+        if self.number is not None and not (self.extra and
+                                            DOM_ID in self.extra):
+            yield DOM_ID
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, dict(self))
+
+
+class PositionedRecord(Record):
+    """
+    Record placed by a :const:`~nod2svg.constants.TICKPOS`, which is kept
+    as the integer coordinates also read as :const:`~nod2svg.constants.X`
+    & :const:`~nod2svg.constants.Y`.
+    """
+    __slots__ = ('x', 'y')
+    FIELDS = {X: 'x', Y: 'y'}
+
+    def __getitem__(self, key):
+        if key == TICKPOS:
+            if self.x is None or self.y is None:
+                raise KeyError(key)
+            return '{{{0}, {1}}}'.format(self.x, self.y)
+        return Record.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        if key == TICKPOS:
+            self.x, self.y = parse_tick_position(value)
+        else:
+            Record.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key == TICKPOS:
+            if self.x is None:
+                raise KeyError(key)
+            self.x = self.y = None
+        else:
+            Record.__delitem__(self, key)
+
+    def __iter__(self):
+        for key in Record.__iter__(self):
+            yield key
+            if key == TYPE and self.x is not None and self.y is not None:
+                yield TICKPOS
+
+
+class Node(PositionedRecord):
+    """
+    A Node record.
+
+    .. versionadded:: 0.2.0
+    """
+    __slots__ = ('dont_play_note', 'signalling_method')
+    KIND = NODE
+    FIELDS = dict(PositionedRecord.FIELDS, **{
+        DONT_PLAY_NOTE: 'dont_play_note',
+        SIGNALLING_METHOD: 'signalling_method'})
+
+
+class Edge(Record):
+    """
+    An Edge record.
+
+    .. versionadded:: 0.2.0
+    """
+    __slots__ = ('from_node', 'to_node', 'path', 'wormhole')
+    KIND = EDGE
+    FIELDS = {FROM_NODE: 'from_node',
+              TO_NODE: 'to_node',
+              PATH: 'path',
+              WORMHOLE: 'wormhole'}
+
+
+class TextBox(PositionedRecord):
+    """
+    A text box record.
+
+    .. versionadded:: 0.2.0
+    """
+    __slots__ = ('text',)
+    KIND = TEXTBOX
+    FIELDS = dict(PositionedRecord.FIELDS, **{TEXT: 'text'})
+
+
+RECORDS = dict((cls.KIND, cls) for cls in (Node, Edge, TextBox))
+
+
+def record(fields):
+    """
+    Convert the property list fields of an element into a record, when it
+    is a Node, Edge, or text box. Other elements are returned as they are.
+
+    :param fields: Property list fields of the element.
+    :type fields: :class:`dict`
+    :rtype: :class:`Record`, or :class:`dict`
+    :raises: :class:`ValueError` for malformed tick positions.
+
+    .. versionadded:: 0.2.0
+    """
+    if not isinstance(fields, dict):
+        return fields
+    try:
+        cls = RECORDS.get(fields.get(TYPE))
+    except TypeError:
+        # An unhashable type.
+        return fields
+    if cls is None:
+        return fields
+    return cls(fields)
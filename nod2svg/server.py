@@ -0,0 +1,334 @@
+""":mod:`nod2svg.server` --- Local HTTP render service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Serves SVG images of Nodal documents over HTTP from one long running
+process, using only the standard library::
+
+    $ nod2svg --serve 8000
+
+Documents are either posted as the request body, or named by path::
+
+    $ curl --data-binary @generative_music.nod localhost:8000/render
+    $ curl 'localhost:8000/render?path=generative_music.nod&stylesheet=1'
+
+Any of :attr:`~nod2svg.main.NodalImage.RENDER_OPTIONS` may be given in the
+query string. Parsed documents & rendered images are each kept in a least
+recently used cache, keyed by a hash of the document's contents. Counters
+of requests, latency, and cache hit rates are served as JSON from
+``/status``.
+
+.. versionadded:: 0.2.0
+"""
+import collections
+import hashlib
+import json
+import os
+import threading
+from multiprocessing.pool import ThreadPool
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urlparse import parse_qs, urlsplit
+
+from .lru import LRUCache
+from .main import (VERSION, NodalImage, decimal_places, hop_limit,
+                   overview_pixels, region_box, scale_factor, timer)
+
+__all__ = ('LRUCache',
+           'RenderHandler',
+           'RenderServer',
+           'serve')
+
+# Number of recent request latencies kept for percentiles.
+LATENCY_WINDOW = 1000
+# Largest document accepted in a request body.
+MAX_BODY = 64 * 1024 * 1024
+
+
+class RenderServer(HTTPServer):
+    """
+    HTTP server rendering Nodal documents, handling requests on a pool of
+    threads.
+
+    :param address: ``(host, port)`` to listen on.
+    :type address: :class:`tuple`
+    :param threads: Number of request threads. Default=``4``
+    :type threads: :class:`numbers.Integral`
+    :param documents: Number of parsed documents kept. Default=``32``
+    :type documents: :class:`numbers.Integral`
+    :param images: Number of rendered images kept. Default=``128``
+    :type images: :class:`numbers.Integral`
+    :param root: Directory that documents requested by path must be
+                 within. Defaults to the current directory.
+    :type root: :class:`basestring`
+    :param options: Default :attr:`~nod2svg.main.NodalImage.RENDER_OPTIONS`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, address, threads=4, documents=32, images=128,
+                 root=None, **options):
+        for name in options:
+            if name not in NodalImage.RENDER_OPTIONS:
+                raise TypeError('Unknown render option {0!r}'.format(name))
+        HTTPServer.__init__(self, address, RenderHandler)
+        self.options = _normalized(options)
+        self.root = os.path.realpath(root or os.getcwd())
+        #: Parsed :class:`~nod2svg.main.NodalImage` instances by hash,
+        #: with their own render options as loaded.
+        self.documents = LRUCache(documents)
+        #: Rendered images by hash & render options.
+        self.images = LRUCache(images)
+        self.pool = ThreadPool(threads)
+        self.threads = threads
+        self._lock = threading.Lock()
+        # Locks of documents being parsed or rendered, with their number
+        # of waiting requests. Concurrent requests for one document wait
+        # for a single parse & render, rather than repeating it.
+        self._flights = {}
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def process_request(self, request, client_address):
+        self.pool.apply_async(self._process_request,
+                              (request, client_address))
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.close()
+        self.pool.join()
+
+    def render(self, data, options):
+        """
+        Render the Nodal document ``data``, reusing cached documents &
+        images.
+
+        :param data: Contents of a Nodal document.
+        :type data: :class:`bytes`
+        :param options: Render options, overriding the server defaults.
+        :type options: :class:`dict`
+        :returns: The SVG image.
+        :rtype: :class:`bytes`
+        """
+        settings = dict(self.options, **_normalized(options))
+        digest = hashlib.sha256(data).hexdigest()
+        key = (digest, tuple(sorted(settings.items())))
+        image = self.images.get(key)
+        if image is not None:
+            return image
+        with self._lock:
+            lock, waiting = self._flights.get(digest, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._flights[digest] = (lock, waiting + 1)
+        try:
+            with lock:
+                # Another request may have rendered it meanwhile.
+                image = self.images.peek(key)
+                if image is None:
+                    image = self._render(digest, data, settings)
+                    self.images.put(key, image)
+        finally:
+            with self._lock:
+                lock, waiting = self._flights[digest]
+                if waiting == 1:
+                    del self._flights[digest]
+                else:
+                    self._flights[digest] = (lock, waiting - 1)
+        return image
+
+    def _render(self, digest, data, settings):
+        entry = self.documents.get(digest)
+        if entry is None:
+            document = NodalImage(data=data)
+            entry = (document, document.render_options())
+            self.documents.put(digest, entry)
+        document, defaults = entry
+        for name in NodalImage.RENDER_OPTIONS:
+            setattr(document, name, settings.get(name, defaults[name]))
+        return document.dumps()
+
+    def record(self, seconds, error=False):
+        """Count a handled request."""
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.seconds += seconds
+            self.latencies.append(seconds)
+
+    def status(self):
+        """
+        Request, latency & cache counters.
+
+        :rtype: :class:`dict`
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            requests, errors, seconds = self.requests, self.errors, \
+                self.seconds
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1,
+                                 int(len(latencies) * fraction))]
+        return {'version': VERSION,
+                'threads': self.threads,
+                'requests': requests,
+                'errors': errors,
+                'latency': {'mean': seconds / requests if requests else None,
+                            'p50': percentile(0.5),
+                            'p95': percentile(0.95),
+                            'max': latencies[-1] if latencies else None},
+                'documents': self.documents.status(),
+                'images': self.images.status()}
+
+
+def _normalized(options):
+    # Render options as NodalImage keeps them, such as seeds as a tuple,
+    # so they can key the image cache.
+    image = NodalImage(**options)
+    return dict((name, getattr(image, name)) for name in options)
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """
+    Handles ``/render`` & ``/status`` requests for a :class:`RenderServer`.
+
+    .. versionadded:: 0.2.0
+    """
+    server_version = 'nod2svg/' + VERSION
+
+    def do_GET(self):
+        self.handle_render()
+
+    def do_POST(self):
+        self.handle_render()
+
+    def handle_render(self):
+        started = timer()
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == '/status':
+                self.send(200, 'application/json',
+                          json.dumps(self.server.status()).encode('utf-8'))
+                return
+            elif url.path != '/render':
+                raise HTTPError(404, 'Not found')
+            options = self.render_options(query)
+            data = self.document(query)
+            try:
+                image = self.server.render(data, options)
+            except Exception as err:
+                raise HTTPError(422, '{0}: {1}'.format(type(err).__name__,
+                                                       err))
+            self.send(200, 'image/svg+xml', image)
+            self.server.record(timer() - started)
+        except HTTPError as err:
+            self.send(err.status, 'text/plain', err.message.encode('utf-8'))
+            self.server.record(timer() - started, error=True)
+
+    def document(self, query):
+        """Read the requested document's contents."""
+        if 'path' in query:
+            path = os.path.realpath(os.path.join(self.server.root,
+                                                 query['path'][0]))
+            if not path.startswith(os.path.join(self.server.root, '')):
+                raise HTTPError(403, 'Path outside of served directory')
+            try:
+                with open(path, 'rb') as fd:
+                    return fd.read()
+            except (IOError, OSError):
+                raise HTTPError(404, 'No such document')
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            raise HTTPError(400, 'Post a Nodal document, or give a path')
+        elif length > MAX_BODY:
+            raise HTTPError(413, 'Document too large')
+        return self.rfile.read(length)
+
+    def render_options(self, query):
+        """Parse render options from the query string."""
+        options = {}
+        for name, values in query.items():
+            if name == 'path':
+                continue
+            elif name not in NodalImage.RENDER_OPTIONS:
+                raise HTTPError(400, 'Unknown render option {0!r}'.format(
+                    name))
+            value = values[-1]
+            try:
+                if name == 'stylesheet':
+                    value = value.lower() in ('1', 'true', 'yes', 'on')
+                elif name == 'scale':
+                    value = scale_factor(value)
+                elif name == 'precision':
+                    value = decimal_places(value)
+                elif name == 'overview':
+                    value = overview_pixels(value)
+                elif name == 'hops':
+                    value = hop_limit(value)
+                elif name == 'seeds':
+                    value = tuple(value.split(','))
+                elif name == 'region':
+                    value = region_box(value)
+            except ValueError:
+                raise HTTPError(400, 'Invalid {0} {1!r}'.format(name, value))
+            options[name] = value
+        return options
+
+    def send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Request lines are noise in a service; errors still surface.
+        pass
+
+
+class HTTPError(Exception):
+    """A response status & message for a failed request."""
+
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+        self.message = message
+
+
+def serve(host='127.0.0.1', port=8000, **kwargs):
+    """
+    Serve forever, or until interrupted.
+
+    :param host: Address to listen on. Default=``'127.0.0.1'``
+    :type host: :class:`basestring`
+    :param port: Port to listen on. Default=``8000``
+    :type port: :class:`numbers.Integral`
+    :param kwargs: Passed to :class:`RenderServer`.
+
+    .. versionadded:: 0.2.0
+    """
+    server = RenderServer((host, port), **kwargs)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,156 @@
+""":mod:`nod2svg.spatial` --- Spatial index of elements
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Finds the elements crossing a rectangle without visiting every element, so
+that one region of a large document can be rendered on its own::
+
+    from nod2svg.spatial import GridIndex
+
+    index = GridIndex()
+    index.insert('1', (0, 0, 166320, 166320))
+    index.query((-100, -100, 100, 100))  # {'1'}
+
+Boxes are ``(left, top, right, bottom)`` tuples in document units. Each box
+is filed under every grid cell it covers, and cells are multiples of
+:const:`~nod2svg.constants.GRID_TICK`. Boxes covering very many cells, such
+as long Edges, are instead kept aside and tested on every query.
+
+.. versionadded:: 0.2.0
+"""
+from .constants import GRID_TICK
+
+__all__ = ('CELL_SIZE',
+           'GridIndex',
+           'crosses',
+           'intersects')
+
+#: Default width & height of grid cells.
+CELL_SIZE = GRID_TICK * 8
+# Boxes covering more cells than this are tested on every query instead.
+MAX_CELLS = 64
+
+
+def intersects(a, b):
+    """
+    Whether boxes ``a`` & ``b`` overlap, or touch.
+
+    :param a: ``(left, top, right, bottom)``
+    :type a: :class:`tuple`
+    :param b: ``(left, top, right, bottom)``
+    :type b: :class:`tuple`
+    :rtype: :class:`bool`
+
+    .. versionadded:: 0.2.0
+    """
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def crosses(start, end, box):
+    """
+    Whether the line segment from ``start`` to ``end`` overlaps, or
+    touches, ``box``.
+
+    :param start: ``(x, y)``
+    :type start: :class:`tuple`
+    :param end: ``(x, y)``
+    :type end: :class:`tuple`
+    :param box: ``(left, top, right, bottom)``
+    :type box: :class:`tuple`
+    :rtype: :class:`bool`
+
+    .. versionadded:: 0.2.0
+    """
+    # Clip the segment to the box, one edge of the box at a time.
+    x, y = start
+    dx = end[0] - x
+    dy = end[1] - y
+    low, high = 0.0, 1.0
+    for p, q in ((-dx, x - box[0]), (dx, box[2] - x),
+                 (-dy, y - box[1]), (dy, box[3] - y)):
+        if p == 0:
+            if q < 0:
+                # Parallel to, and outside of, this edge.
+                return False
+        elif p < 0:
+            low = max(low, q / float(p))
+        else:
+            high = min(high, q / float(p))
+        if low > high:
+            return False
+    return True
+
+
+class GridIndex(object):
+    """
+    Uniform grid of keyed boxes.
+
+    :param cell_size: Width & height of grid cells. Default=:const:`CELL_SIZE`
+    :type cell_size: :class:`numbers.Real`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        #: Map of keys to their boxes.
+        self.boxes = {}
+        # Keys by (column, row) cell, and keys of boxes too large for cells.
+        self._cells = {}
+        self._large = []
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _span(self, box):
+        size = self.cell_size
+        return (int(box[0] // size), int(box[1] // size),
+                int(box[2] // size), int(box[3] // size))
+
+    def insert(self, key, box):
+        """
+        Add ``key`` with bounding ``box``. Keys should be inserted once.
+
+        :param key: Any hashable key, such as an element's key.
+        :param box: ``(left, top, right, bottom)``
+        :type box: :class:`tuple`
+        """
+        box = tuple(box)
+        self.boxes[key] = box
+        left, top, right, bottom = self._span(box)
+        if (right - left + 1) * (bottom - top + 1) > MAX_CELLS:
+            self._large.append(key)
+            return
+        cells = self._cells
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                cells.setdefault((column, row), []).append(key)
+
+    def query(self, box):
+        """
+        Find the keys of all boxes overlapping ``box``.
+
+        :param box: ``(left, top, right, bottom)``
+        :type box: :class:`tuple`
+        :rtype: :class:`set`
+        """
+        left, top, right, bottom = self._span(box)
+        boxes = self.boxes
+        if (right - left + 1) * (bottom - top + 1) > len(self._cells):
+            # Fewer occupied cells than cells covered; visit those instead.
+            cells = [keys for (column, row), keys in self._cells.items()
+                     if left <= column <= right and top <= row <= bottom]
+        else:
+            cells = [self._cells[cell]
+                     for cell in ((column, row)
+                                  for column in range(left, right + 1)
+                                  for row in range(top, bottom + 1))
+                     if cell in self._cells]
+        found = set()
+        for keys in cells:
+            for key in keys:
+                if key not in found and intersects(boxes[key], box):
+                    found.add(key)
+        for key in self._large:
+            if intersects(boxes[key], box):
+                found.add(key)
+        return found
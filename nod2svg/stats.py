@@ -0,0 +1,183 @@
+""":mod:`nod2svg.stats` --- Document statistics
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reports facts about Nodal documents without rendering them, such as
+element counts, the Edge path histogram, and the bounding box::
+
+    from nod2svg.stats import inspect
+
+    facts = inspect(path_to_nod)
+    if facts['edges'] > 100000:
+        ...
+
+Documents are read by :func:`nod2svg.parser.parse`, keeping only the
+fields counted. Each element is tallied as soon as it is read, and only
+its key is held afterwards.
+
+.. versionadded:: 0.2.0
+"""
+import collections
+
+from .batch import iter_jobs, run_jobs
+from .constants import *
+from .main import NodalException
+from .parser import parse
+from .records import parse_tick_position
+
+__all__ = ('InspectResult',
+           'Inspector',
+           'inspect',
+           'inspect_batch')
+
+#: The outcome of inspecting one document. ``stats`` is the dictionary
+#: returned by :func:`inspect`, or ``None`` when ``error`` describes why
+#: the document could not be read.
+InspectResult = collections.namedtuple('InspectResult',
+                                       ('source', 'stats', 'error'))
+
+# Element fields counted by Inspector.
+FIELDS = (TYPE, TICKPOS, FROM_NODE, PATH, WORMHOLE)
+# Element types placed by a TickPos, as by NodalImage.index_elements.
+PLACED = (NODE, EDGE, TEXTBOX)
+
+
+class Inspector(object):
+    """
+    Tallies statistics of one Nodal document, element by element, as
+    :meth:`add` is given each element's fields.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self):
+        #: Number of elements, including any that aren't dictionaries.
+        self.elements = 0
+        self.counts = {NODE: 0, EDGE: 0, TEXTBOX: 0}
+        self.paths = {}
+        self.wormholes = 0
+        #: Number of outgoing Edges by Node key.
+        self.outs = {}
+        #: ``[left, top, right, bottom]`` of placed elements, or ``None``.
+        self.mbr = None
+        #: Top level fields of the document, such as
+        #: :const:`~nod2svg.constants.TITLE` &
+        #: :const:`~nod2svg.constants.AUTHOR`.
+        self.document = {}
+
+    def add(self, element):
+        """
+        Count one element. Suits the ``factory`` of
+        :func:`~nod2svg.parser.parse`, keeping nothing in its place.
+
+        :param element: Fields of the element.
+        :type element: :class:`dict`
+        :raises: :class:`ValueError` for malformed tick positions.
+        """
+        kind = element.get(TYPE)
+        if kind in self.counts:
+            self.counts[kind] += 1
+        if kind == EDGE:
+            path = element.get(PATH)
+            if path is not None:
+                self.paths[path] = self.paths.get(path, 0) + 1
+            if element.get(WORMHOLE):
+                self.wormholes += 1
+            if FROM_NODE in element:
+                from_key = '{0}'.format(element[FROM_NODE])
+                self.outs[from_key] = self.outs.get(from_key, 0) + 1
+        if kind in PLACED and TICKPOS in element:
+            x, y = parse_tick_position(element[TICKPOS])
+            if self.mbr is None:
+                self.mbr = [x, y, x, y]
+            else:
+                mbr = self.mbr
+                mbr[0] = min(mbr[0], x)
+                mbr[1] = min(mbr[1], y)
+                mbr[2] = max(mbr[2], x)
+                mbr[3] = max(mbr[3], y)
+
+    def result(self):
+        """
+        The statistics tallied so far.
+
+        :rtype: :class:`dict`
+        """
+        return {'elements': self.elements,
+                'nodes': self.counts[NODE],
+                'edges': self.counts[EDGE],
+                'text_boxes': self.counts[TEXTBOX],
+                'paths': dict(self.paths),
+                'wormholes': self.wormholes,
+                'bounds': list(self.mbr) if self.mbr is not None else None,
+                'max_out_degree': max(self.outs.values()) if self.outs else 0,
+                'title': self.document.get(TITLE),
+                'author': self.document.get(AUTHOR)}
+
+
+def inspect(path):
+    """
+    Gather statistics of a Nodal document, without rendering it.
+
+    The result holds counts of ``elements``, ``nodes``, ``edges`` &
+    ``text_boxes``, a histogram of Edge ``paths``, the number of
+    ``wormholes``, the ``bounds`` of placed elements as ``[left, top,
+    right, bottom]``, the ``max_out_degree`` of any Node, which decides how
+    many :const:`~nod2svg.constants.EDGE_COLORS` are cycled through, and
+    the document's ``title`` & ``author``.
+
+    :param path: The path to a Nodal document, or a readable binary
+                 file-like object.
+    :type path: :class:`basestring`
+    :rtype: :class:`dict`
+    :raises: :class:`~nod2svg.main.NodalException`
+
+    .. versionadded:: 0.2.0
+    """
+    if hasattr(path, 'read'):
+        return _inspect(path)
+    with open(path, 'rb') as fd:
+        return _inspect(fd)
+
+
+def _inspect(fd):
+    inspector = Inspector()
+    try:
+        nod = parse(fd, FIELDS, inspector.add)
+    except ValueError as err:
+        raise NodalException('Invalid Nodal document: {0}'.format(err))
+    if not (isinstance(nod, dict) and isinstance(nod.get(ELEMENTS), dict)):
+        raise NodalException('Not a Nodal matrix')
+    # Counts elements that aren't dictionaries too.
+    inspector.elements = len(nod[ELEMENTS])
+    inspector.document = nod
+    return inspector.result()
+
+
+def _inspect_job(source):
+    try:
+        return InspectResult(source, inspect(source), None)
+    except Exception as err:
+        message = '{0}: {1}'.format(type(err).__name__, err)
+        return InspectResult(source, None, message)
+
+
+def inspect_batch(paths, processes=None):
+    """
+    Inspect every Nodal document found in ``paths``, spreading the work
+    over a :class:`multiprocessing.Pool`.
+
+    Errors are reported on each result rather than raised. Results are
+    yielded in completion order.
+
+    :param paths: Nodal documents, or directories containing them.
+    :type paths: :class:`collections.Iterable`
+    :param processes: Number of worker processes. Defaults to the number
+                      of CPUs. ``1`` inspects in the calling process.
+    :type processes: :class:`numbers.Integral`
+    :rtype: :class:`collections.Iterator` of :class:`InspectResult`
+
+    .. versionadded:: 0.2.0
+    """
+    sources = (source for source, _ in iter_jobs(paths, ''))
+    for result in run_jobs(_inspect_job, sources, processes):
+        yield result
@@ -0,0 +1,186 @@
+""":mod:`nod2svg.watch` --- Re-render documents as they change
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Keeps one warm process polling Nodal documents, and converts each one
+again shortly after it is saved::
+
+    from nod2svg.watch import Watcher
+
+    Watcher(['matrices/'], 'svg/').run(print)
+
+Bursts of saves are debounced, so a document is only converted once it has
+stopped changing. Watching polls rather than subscribing to file system
+events, so a save is converted roughly ``interval + debounce`` seconds after
+it happens, plus the time taken to render it: about 40 ms with the defaults.
+Directories are only walked again when one of them changes, so each poll
+costs one :func:`os.stat` per watched document & directory.
+
+.. versionadded:: 0.2.0
+"""
+import os
+import time
+
+from .batch import convert, iter_jobs
+from .constants import SVG_EXTENSION
+
+__all__ = ('Watcher',)
+
+
+class Watcher(object):
+    """
+    Poll Nodal documents, and convert those that change.
+
+    :param paths: Nodal documents, or directories containing them.
+                  Directories are walked again whenever one of them
+                  changes, so new documents are picked up too.
+    :type paths: :class:`collections.Iterable`
+    :param output_dir: The directory to write SVG images into. See
+                       :func:`~nod2svg.batch.iter_jobs`.
+    :type output_dir: :class:`basestring`
+    :param suffix: File extension of written images. Default=``'.svg'``
+    :type suffix: :class:`basestring`
+    :param jobs: Explicit ``(source, destination)`` pairs to watch as well.
+    :type jobs: :class:`collections.Iterable`
+    :param interval: Seconds between polls. Default=``0.02``
+    :type interval: :class:`numbers.Real`
+    :param debounce: Seconds a document must stay unchanged before it is
+                     converted. Default=``0.02``
+    :type debounce: :class:`numbers.Real`
+    :param options: Passed to :func:`~nod2svg.batch.convert`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, paths=(), output_dir=None, suffix=SVG_EXTENSION,
+                 jobs=(), interval=0.02, debounce=0.02, **options):
+        self.paths = list(paths)
+        self.output_dir = output_dir
+        self.suffix = suffix
+        self.jobs = list(jobs)
+        self.interval = interval
+        self.debounce = debounce
+        self.options = options
+        # Last converted signature of each source.
+        self.seen = {}
+        # Changed sources waiting to settle, with when they last changed.
+        self.pending = {}
+        # Signatures of the walked directories, & the jobs found in them.
+        self.tree = None
+        self.walked = []
+
+    def scan(self):
+        """
+        Find every watched document.
+
+        :returns: Map of ``(source, destination)`` jobs to signatures of
+                  the sources, which change whenever they are saved.
+        :rtype: :class:`dict`
+        """
+        jobs = list(self.jobs)
+        if self.paths:
+            jobs.extend(self.walk())
+        found = {}
+        for job in jobs:
+            try:
+                status = os.stat(job[0])
+            except OSError:
+                continue
+            found[job] = (status.st_mtime, status.st_size)
+        return found
+
+    def walk(self):
+        """
+        List the jobs beneath :attr:`paths`.
+
+        The directories are only walked again once the signature of one of
+        them has changed, as adding, removing or renaming a document
+        changes its directory.
+
+        :returns: ``(source, destination)`` jobs.
+        :rtype: :class:`list`
+        """
+        if self.tree is not None and \
+                all(_signature(path) == signature
+                    for path, signature in self.tree.items()):
+            return self.walked
+        # Sign the directories before listing them, so that a change made
+        # during the walk is caught by the next one.
+        tree = {}
+        for path in self.paths:
+            tree[path] = _signature(path)
+            if os.path.isdir(path):
+                for dirpath, dirnames, filenames in os.walk(path):
+                    tree[dirpath] = _signature(dirpath)
+        self.walked = list(iter_jobs(self.paths, self.output_dir,
+                                     self.suffix))
+        self.tree = tree
+        return self.walked
+
+    def poll(self, now=None):
+        """
+        Check every document once, converting those that have changed and
+        then settled for :attr:`debounce` seconds.
+
+        :param now: Current :func:`time.time`, for testing.
+        :type now: :class:`numbers.Real`
+        :returns: Results of any conversions.
+        :rtype: :class:`list` of :class:`~nod2svg.batch.BatchResult`
+        """
+        if now is None:
+            now = time.time()
+        found = self.scan()
+        for job in list(self.seen):
+            if job not in found:
+                del self.seen[job]
+        for job in list(self.pending):
+            if job not in found:
+                del self.pending[job]
+        results = []
+        for job, signature in found.items():
+            if self.seen.get(job) == signature:
+                self.pending.pop(job, None)
+                continue
+            waiting = self.pending.get(job)
+            if waiting is None or waiting[0] != signature:
+                # Changed since the last poll; wait for it to settle.
+                self.pending[job] = (signature, now)
+                if self.debounce > 0:
+                    continue
+            elif now - waiting[1] < self.debounce:
+                continue
+            del self.pending[job]
+            self.seen[job] = signature
+            results.append(convert(job, **self.options))
+        return results
+
+    def run(self, callback=None, polls=None):
+        """
+        Poll forever, or until interrupted.
+
+        :param callback: Optional function called with each
+                         :class:`~nod2svg.batch.BatchResult`.
+        :type callback: :class:`collections.Callable`
+        :param polls: Optional number of polls before returning.
+        :type polls: :class:`numbers.Integral`
+        """
+        count = 0
+        while polls is None or count < polls:
+            started = time.time()
+            for result in self.poll(started):
+                if callback is not None:
+                    callback(result)
+            count += 1
+            # Wake up no sooner than a debounce would finish.
+            delay = self.interval
+            if self.pending:
+                delay = min(delay, self.debounce)
+            time.sleep(max(0, delay - (time.time() - started)))
+
+
+def _signature(path):
+    """Modification time & size of ``path``, or ``None`` when missing."""
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return status.st_mtime, status.st_size
@@ -0,0 +1,413 @@
+""":mod:`nod2svg.writer` --- SVG output targets
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:class:`~nod2svg.main.NodalImage` renders by emitting ``start``, ``end``,
+``data``, ``comment`` and ``subtree`` events to a writer. A
+:class:`TreeWriter` collects the events into an ElementTree DOM, and a
+:class:`StreamWriter` serializes them straight to UTF-8 bytes without ever
+holding the whole document.
+
+Ready-built elements are placed with their namespaces declared on
+themselves by :func:`localize`, so both writers serialize them to the same
+text.
+
+Serialized chunks can be compressed as they are produced with
+:func:`compress`, using any codec in
+:const:`~nod2svg.constants.COMPRESSIONS` that this Python supports.
+
+.. versionadded:: 0.2.0
+"""
+from xml.sax.saxutils import escape
+import copy
+import os
+import re
+import zlib
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from .constants import *
+
+try:
+    import bz2
+except ImportError:
+    bz2 = None
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+__all__ = ('StreamWriter',
+           'TreeWriter',
+           'compress',
+           'compression_for',
+           'compression_suffix',
+           'compressor',
+           'localize',
+           'tostring')
+
+SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+#: Prefixes of the namespaces declared by the root ``<svg>`` of every
+#: image. ``''`` is the default namespace.
+SVG_NAMESPACES = {SVG_NAMESPACE: '', XLINK_NAMESPACE: 'xlink'}
+
+# Same entities ElementTree escapes in attribute values.
+ATTRIBUTE_ENTITIES = {'"': '&quot;',
+                      '\r': '&#13;',
+                      '\n': '&#10;',
+                      '\t': '&#09;'}
+ATTRIBUTE_SPECIALS = re.compile('[&<>"\r\n\t]')
+
+# Output file extensions implying a compression codec.
+COMPRESSION_EXTENSIONS = ((SVGZ_EXTENSION, COMPRESSION_GZIP),
+                          ('.gz', COMPRESSION_GZIP),
+                          ('.bz2', COMPRESSION_BZIP2),
+                          ('.xz', COMPRESSION_XZ))
+# Extension of images written with each codec.
+COMPRESSION_SUFFIXES = {COMPRESSION_NONE: SVG_EXTENSION,
+                        COMPRESSION_GZIP: SVGZ_EXTENSION,
+                        COMPRESSION_BZIP2: SVG_EXTENSION + '.bz2',
+                        COMPRESSION_XZ: SVG_EXTENSION + '.xz'}
+
+
+class TreeWriter(object):
+    """
+    Build an :mod:`xml.etree.cElementTree` DOM from render events.
+
+    :param parent: Optional element to append new elements to.
+    :type parent: :class:`xml.etree.cElementTree.Element`
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, parent=None):
+        self.root = parent
+        self.stack = [] if parent is None else [parent]
+
+    def start(self, tag, attrib):
+        """
+        Open a new element as a child of the current element.
+
+        :rtype: :class:`xml.etree.cElementTree.Element`
+        """
+        if self.stack:
+            element = ET.SubElement(self.stack[-1], tag, attrib)
+        else:
+            element = self.root = ET.Element(tag, attrib)
+        self.stack.append(element)
+        return element
+
+    def end(self, tag):
+        """Close the current element."""
+        self.stack.pop()
+
+    def element(self, tag, attrib):
+        """Add an element without children."""
+        self.start(tag, attrib)
+        self.end(tag)
+
+    def data(self, text):
+        """Set the text content of the current element."""
+        current = self.stack[-1]
+        current.text = (current.text or '') + text
+
+    def comment(self, text):
+        """Add an XML comment to the current element."""
+        self.stack[-1].append(ET.Comment(text))
+
+    def subtree(self, element):
+        """
+        Append a ready-built element to the current element, as
+        :func:`localize` leaves it.
+        """
+        self.stack[-1].append(localize(element))
+
+    def markup(self, markup):
+        """
+        Append a copy of text box markup's element.
+
+        :param markup: Text box markup.
+        :type markup: :class:`~nod2svg.markup.Markup`
+        """
+        self.stack[-1].append(markup.copy())
+
+    def close(self):
+        """
+        Finish writing.
+
+        :returns: The root element.
+        :rtype: :class:`xml.etree.cElementTree.Element`
+        """
+        return self.root
+
+
+class StreamWriter(object):
+    """
+    Serialize render events as they arrive.
+
+    Output is buffered, and collected with :meth:`take`. The serialization
+    matches :func:`xml.etree.cElementTree.tostring` of the tree a
+    :class:`TreeWriter` builds from the same events, byte for byte.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self):
+        self.pieces = []
+        #: Number of characters buffered since the last :meth:`take`.
+        self.size = 0
+        self._pending = False
+
+    def _write(self, text):
+        if self._pending:
+            self.pieces.append('>')
+            self._pending = False
+        self.pieces.append(text)
+        self.size += len(text)
+
+    def start(self, tag, attrib):
+        """Open a new element."""
+        parts = ['<', tag]
+        for name in attrib:
+            value = attrib[name]
+            # Most values are plain numbers, so only escape when needed.
+            if ATTRIBUTE_SPECIALS.search(value):
+                value = escape(value, ATTRIBUTE_ENTITIES)
+            parts.append(' {0}="{1}"'.format(name, value))
+        self._write(''.join(parts))
+        # The start tag is left open until we know if it has content.
+        self._pending = True
+
+    def end(self, tag):
+        """Close the current element."""
+        if self._pending:
+            self.pieces.append(' />')
+            self.size += 3
+            self._pending = False
+        else:
+            self._write('</{0}>'.format(tag))
+
+    def element(self, tag, attrib):
+        """Add an element without children."""
+        self.start(tag, attrib)
+        self.end(tag)
+
+    def data(self, text):
+        """Add text content to the current element."""
+        if text:
+            self._write(escape(text))
+
+    def comment(self, text):
+        """Add an XML comment."""
+        self._write('<!--{0}-->'.format(text))
+
+    def subtree(self, element):
+        """Serialize a ready-built element, as :func:`localize` leaves it."""
+        self._write(tostring(localize(element)))
+
+    def markup(self, markup):
+        """
+        Write text box markup's serialized text, as it is.
+
+        :param markup: Text box markup.
+        :type markup: :class:`~nod2svg.markup.Markup`
+        """
+        self._write(markup.text)
+
+    def take(self):
+        """
+        Remove and return everything buffered so far.
+
+        :rtype: :class:`bytes`
+        """
+        chunk = ''.join(self.pieces)
+        self.pieces = []
+        self.size = 0
+        return chunk.encode('utf-8')
+
+    def close(self):
+        """
+        Finish writing.
+
+        :returns: Any remaining buffered output.
+        :rtype: :class:`bytes`
+        """
+        return self.take()
+
+
+def localize(element, namespaces=SVG_NAMESPACES):
+    """
+    Declare the namespaces used by ``element`` & its descendants on
+    ``element`` itself, naming them with prefixes rather than
+    ``{uri}name`` notation.
+
+    ElementTree otherwise declares every namespace of a tree on its root,
+    so an element serialized alone would differ from the same element
+    serialized within the whole image. Namespaces already declared around
+    the element keep their prefixes, and others are named ``ns0``,
+    ``ns1``, ... in document order.
+
+    :param element: The element to place.
+    :type element: :class:`xml.etree.cElementTree.Element`
+    :param namespaces: Prefixes of the namespaces declared around the
+                       element, with ``''`` for the default namespace.
+                       Defaults to those of the root ``<svg>``.
+    :type namespaces: :class:`dict`
+    :returns: ``element`` itself when it uses no namespaces, or else a
+              changed copy.
+    :rtype: :class:`xml.etree.cElementTree.Element`
+
+    .. versionadded:: 0.2.0
+    """
+    nodes = [node for node in element.iter() if not callable(node.tag)]
+    if not any(node.tag[:1] == '{' or
+               any(name[:1] == '{' for name in node.attrib)
+               for node in nodes):
+        return element
+    element = copy.deepcopy(element)
+    prefixes = dict(namespaces)
+    # Prefixes of default namespaces, for attributes, which are never in
+    # the default namespace.
+    attribute_prefixes = {}
+    declared = []
+
+    def declare(uri):
+        taken = set(prefixes.values()) | set(attribute_prefixes.values())
+        prefix = 'ns{0}'.format(len(declared))
+        while prefix in taken:
+            prefix += '_'
+        declared.append((prefix, uri))
+        return prefix
+
+    def qualify(name, attribute=False):
+        if name[:1] != '{':
+            return name
+        uri, local = name[1:].split('}', 1)
+        prefix = prefixes.get(uri)
+        if prefix is None:
+            prefix = prefixes[uri] = declare(uri)
+        elif not prefix and attribute:
+            prefix = attribute_prefixes.get(uri)
+            if prefix is None:
+                prefix = attribute_prefixes[uri] = declare(uri)
+        return '{0}:{1}'.format(prefix, local) if prefix else local
+
+    for node in element.iter():
+        if callable(node.tag):
+            continue
+        node.tag = qualify(node.tag)
+        if any(name[:1] == '{' for name in node.attrib):
+            attrib = [(qualify(name, True), value)
+                      for name, value in node.attrib.items()]
+            node.attrib.clear()
+            node.attrib.update(attrib)
+    for prefix, uri in declared:
+        element.set('xmlns:' + prefix, uri)
+    return element
+
+
+def tostring(element):
+    """
+    Serialize an element as text, the same way under Python 2 & 3.
+
+    :param element: The element to serialize.
+    :type element: :class:`xml.etree.cElementTree.Element`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    return ET.tostring(element, encoding='utf-8').decode('utf-8')
+
+
+def compression_for(path):
+    """
+    The codec implied by the extension of ``path``, such as
+    :const:`~nod2svg.constants.COMPRESSION_GZIP` for ``.svgz`` & ``.gz``.
+
+    :param path: The system path to be written.
+    :type path: :class:`basestring`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for suffix, compression in COMPRESSION_EXTENSIONS:
+        if extension == suffix:
+            return compression
+    return COMPRESSION_NONE
+
+
+def compression_suffix(compression):
+    """
+    The file extension of images written with ``compression``.
+
+    :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+    :type compression: :class:`basestring`
+    :rtype: :class:`basestring`
+
+    .. versionadded:: 0.2.0
+    """
+    return COMPRESSION_SUFFIXES[compression]
+
+
+def compressor(compression):
+    """
+    Create an incremental compressor for ``compression``.
+
+    Gzip streams are written with a zero modification time, so the same
+    document always compresses to the same bytes.
+
+    :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+    :type compression: :class:`basestring`
+    :returns: An object with ``compress(data)`` & ``flush()`` methods, or
+              ``None`` for :const:`~nod2svg.constants.COMPRESSION_NONE`.
+    :raises: :class:`ValueError` for unknown or unavailable codecs.
+
+    .. versionadded:: 0.2.0
+    """
+    if compression == COMPRESSION_NONE:
+        return None
+    elif compression == COMPRESSION_GZIP:
+        # A window of 16 + 15 bits writes a gzip header & trailer.
+        return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED,
+                                16 + zlib.MAX_WBITS)
+    elif compression == COMPRESSION_BZIP2 and bz2 is not None:
+        return bz2.BZ2Compressor()
+    elif compression == COMPRESSION_XZ and lzma is not None:
+        return lzma.LZMACompressor()
+    elif compression in COMPRESSIONS:
+        raise ValueError('Compression {0!r} is not supported by this '
+                         'Python'.format(compression))
+    raise ValueError('Unknown compression {0!r}'.format(compression))
+
+
+def compress(chunks, compression):
+    """
+    Compress an iterable of :class:`bytes` chunks as they arrive.
+
+    :param chunks: Uncompressed output, such as from
+                   :meth:`~nod2svg.main.NodalImage.iterdump`.
+    :type chunks: :class:`collections.Iterable`
+    :param compression: One of :const:`~nod2svg.constants.COMPRESSIONS`.
+    :type compression: :class:`basestring`
+    :rtype: :class:`collections.Iterator`
+    :raises: :class:`ValueError` for unknown or unavailable codecs.
+
+    .. versionadded:: 0.2.0
+    """
+    # Create the codec now, so unsupported codecs fail before any output.
+    codec = compressor(compression)
+    if codec is None:
+        return iter(chunks)
+    return _compressed(chunks, codec)
+
+
+def _compressed(chunks, codec):
+    for chunk in chunks:
+        chunk = codec.compress(chunk)
+        if chunk:
+            yield chunk
+    yield codec.flush()
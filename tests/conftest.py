@@ -0,0 +1,25 @@
+import plistlib
+
+import pytest
+
+from nod2svg.benchmark import synthesize
+from nod2svg.constants import *
+
+
+def dumps(document):
+    """Serialize a Nodal document as an XML property list."""
+    if hasattr(plistlib, 'dumps'):
+        return plistlib.dumps(document)
+    return plistlib.writePlistToString(document)
+
+
+@pytest.fixture
+def document():
+    """A small synthetic document, as a dictionary."""
+    return synthesize(nodes=200, text_boxes=20, seed=1)
+
+
+@pytest.fixture
+def data(document):
+    """A small synthetic document, as XML property list bytes."""
+    return dumps(document)
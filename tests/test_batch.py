@@ -0,0 +1,54 @@
+import os
+
+from nod2svg.batch import convert, convert_batch
+from nod2svg.constants import *
+
+from conftest import dumps
+
+
+def test_convert_keeps_colors(document, tmpdir):
+    document.pop(STYLE_BACKGROUND_COLOR, None)
+    source = tmpdir.join('plain.nod')
+    source.write_binary(dumps(document))
+    destination = tmpdir.join('plain.svg')
+    result = convert((str(source), str(destination)), bg='#ffffffff')
+    assert result.error is None
+    assert b'background:#ffffff;' in destination.read_binary()
+
+
+def test_convert_resets_options_between_jobs(data, tmpdir):
+    source = tmpdir.join('doc.nod')
+    source.write_binary(data)
+    first = tmpdir.join('first.svg')
+    second = tmpdir.join('second.svg')
+    assert convert((str(source), str(first)), stylesheet=True,
+                   interaction=INTERACTION_STATIC).error is None
+    assert convert((str(source), str(second))).error is None
+    assert b'class="node"' in first.read_binary()
+    assert b'<set ' not in first.read_binary()
+    assert b'class="node"' not in second.read_binary()
+    assert b'<set ' in second.read_binary()
+
+
+def test_incremental_batch(document, data, tmpdir):
+    sources = tmpdir.mkdir('in')
+    output = tmpdir.join('out')
+    sources.join('a.nod').write_binary(data)
+    sources.join('b.nod').write_binary(data)
+
+    def run(**options):
+        results = convert_batch([str(sources)], str(output), processes=1,
+                                incremental=True, **options)
+        return dict((os.path.basename(result.source), result.skipped)
+                    for result in results if result.error is None)
+    assert run() == {'a.nod': False, 'b.nod': False}
+    assert run() == {'a.nod': True, 'b.nod': True}
+    # Touched, but with the same contents.
+    path = str(sources.join('a.nod'))
+    os.utime(path, (1, 1))
+    assert run() == {'a.nod': True, 'b.nod': True}
+    document[TITLE] = 'Changed'
+    sources.join('b.nod').write_binary(dumps(document))
+    assert run() == {'a.nod': True, 'b.nod': False}
+    assert run(stylesheet=True) == {'a.nod': False, 'b.nod': False}
+    assert run(stylesheet=True) == {'a.nod': True, 'b.nod': True}
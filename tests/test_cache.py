@@ -0,0 +1,14 @@
+from nod2svg import batch, cache
+from nod2svg.cache import RenderCache
+
+
+def test_revision_changes_keys(data, tmpdir, monkeypatch):
+    source = tmpdir.join('doc.nod')
+    source.write_binary(data)
+    render_cache = RenderCache(str(tmpdir.join('cache')))
+    key = render_cache.key(str(source), {})
+    settings = batch.Manifest.settings('.svg', {})
+    monkeypatch.setattr(cache, 'RENDER_REVISION', cache.RENDER_REVISION + 1)
+    monkeypatch.setattr(batch, 'RENDER_REVISION', batch.RENDER_REVISION + 1)
+    assert render_cache.key(str(source), {}) != key
+    assert batch.Manifest.settings('.svg', {}) != settings
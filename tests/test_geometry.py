@@ -0,0 +1,94 @@
+import math
+import random
+
+import pytest
+
+from nod2svg import geometry
+from nod2svg.constants import *
+from nod2svg.main import NodalImage
+
+
+def legacy_direct(start, end):
+    """Straight-line path data, as written by nod2svg 0.1."""
+    theta = math.atan2(-(end[Y] - start[Y]), -(end[X] - start[X]))
+    theta %= 2 * math.pi
+    return 'M {0} {1} L {2} {3}'.format(start[X] - 64000 * math.cos(theta),
+                                        start[Y] - 64000 * math.sin(theta),
+                                        end[X] + 70400 * math.cos(theta),
+                                        end[Y] + 70400 * math.sin(theta))
+
+
+def _points(count, seed=7):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        start = {X: rng.randint(-10 ** 6, 10 ** 6),
+                 Y: rng.randint(-10 ** 6, 10 ** 6)}
+        end = {X: rng.randint(-10 ** 6, 10 ** 6),
+               Y: rng.randint(-10 ** 6, 10 ** 6)}
+        # Aligned points take the vertical & horizontal shortcuts.
+        choice = rng.random()
+        if choice < .1:
+            end[X] = start[X]
+        elif choice < .2:
+            end[Y] = start[Y]
+        points.append((start, end))
+    return points
+
+
+def test_segments_match_path_methods():
+    image = NodalImage()
+    methods = {DIRECT: image.path_direct,
+               CITYBLOCK: image.path_city_block,
+               CITYBLOCKFLIPPED: image.path_city_block_flipped}
+    for path, method in methods.items():
+        points = _points(2000)
+        segments = geometry.segments(
+            [path] * len(points),
+            [(s[X], s[Y], e[X], e[Y]) for s, e in points])
+        for (start, end), segment in zip(points, segments):
+            assert geometry.format_path(segment) == method(start, end)
+
+
+def test_direct_matches_legacy_strings():
+    image = NodalImage()
+    for start, end in _points(2000, seed=11):
+        assert image.path_direct(start, end) == legacy_direct(start, end)
+
+
+def test_vectorized_segments_match_scalar():
+    pytest.importorskip('numpy')
+    rng = random.Random(3)
+    points = _points(5000, seed=5)
+    paths = [rng.choice((DIRECT, CITYBLOCK, CITYBLOCKFLIPPED))
+             for _ in points]
+    points = [(s[X], s[Y], e[X], e[Y]) for s, e in points]
+    scalar = geometry.segments(paths, points, vectorize=False)
+    vector = geometry.segments(paths, points, vectorize=True)
+    assert [geometry.format_path(segment) for segment in vector] == \
+        [geometry.format_path(segment) for segment in scalar]
+    assert [geometry.format_compact_path(segment, 100) for segment in
+            vector] == [geometry.format_compact_path(segment, 100)
+                        for segment in scalar]
+
+
+@pytest.mark.parametrize('segment, scale, precision, expected', [
+    ((geometry.LINE, 166320, -332640.5, 100, .25), 1000, 3,
+     'M166.32-332.64l-166.22 332.64'),
+    ((geometry.VERTICAL, 0, 64000, 500000, None), 166320, 3,
+     'M0 .385v2.621'),
+    ((geometry.HORIZONTAL, 1, 2, 3, None), 1, 3, 'M1 2h2'),
+    ((geometry.CITY_BLOCK, -500, 1000, 2000, -3000), 1000, 2,
+     'M-.5 1h2.5v-4'),
+    ((geometry.CITY_BLOCK_FLIPPED, 1000, 1000, 1500, 500), 1000, 3,
+     'M1 1v.5h-.5'),
+])
+def test_compact_paths(segment, scale, precision, expected):
+    assert geometry.format_compact_path(segment, scale,
+                                        precision) == expected
+
+
+def test_format_number():
+    assert [geometry.format_number(value, 3)
+            for value in (.5, -.5, -.0001, 12.34, 3)] == \
+        ['.5', '-.5', '0', '12.34', '3']
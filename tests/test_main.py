@@ -0,0 +1,169 @@
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+import pytest
+
+from nod2svg.constants import *
+from nod2svg.main import EXTENT, NodalException, NodalImage, main
+from nod2svg.spatial import crosses
+
+from conftest import dumps
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def test_colors_without_document_style(document, tmpdir):
+    document.pop(STYLE_BACKGROUND_COLOR, None)
+    document.pop(STYLE_ANNOTATION_COLOR, None)
+    path = tmpdir.join('plain.nod')
+    path.write_binary(dumps(document))
+    image = NodalImage(str(path), bg='#ffffffff', ac='#00000080')
+    assert image.background == '#ffffffff'
+    assert image.annotation == '#00000080'
+    assert b'background:#ffffff;' in image.dumps()
+    assert NodalImage(str(path)).background == NodalImage.DEFAULT_BG
+
+
+def test_colors_override_document_style(document):
+    document[STYLE_BACKGROUND_COLOR] = '#102030ff'
+    image = NodalImage(data=dumps(document))
+    assert image.background == '#102030ff'
+    image.bg = '#ffffffff'
+    assert image.background == '#ffffffff'
+    image.loads(dumps(document))
+    assert image.bg == '#ffffffff'
+    assert image.background == '#ffffffff'
+    image.bg = None
+    assert image.background == '#102030ff'
+
+
+def _paths(svg):
+    """Map each Edge path's ID to its highlighted marker, in order."""
+    root = ET.fromstring(svg)
+    found = []
+    for path in root.iter(SVG + 'path'):
+        if path.get('id', '').startswith('nod' + EDGE):
+            markers = [s.get('to') for s in path.iter(SVG + 'set')
+                       if s.get('attributeName') == 'marker-end']
+            found.append((path.get('id'), markers[0] if markers else None))
+    return found
+
+
+def test_region_finds_crossing_edges(data):
+    image = NodalImage(data=data)
+    x, y, width, height = image.bounds()
+    region = (x + width / 3, y + height / 3, width / 4, height / 4)
+    found = image.query_region(region)
+    padded = (region[0] - EXTENT, region[1] - EXTENT,
+              region[0] + region[2] + EXTENT, region[1] + region[3] + EXTENT)
+    expected = set()
+    for k, v in image.edges.items():
+        start = image.nodes[str(v.from_node)]
+        end = image.nodes[str(v.to_node)]
+        if v.path == CITYBLOCK:
+            corner = (end.x, start.y)
+        elif v.path == CITYBLOCKFLIPPED:
+            corner = (start.x, end.y)
+        else:
+            corner = (start.x, start.y)
+        if crosses((start.x, start.y), corner, padded) or \
+                crosses(corner, (end.x, end.y), padded):
+            expected.add(k)
+    assert set(k for k in found if k in image.edges) == expected
+
+
+def test_region_keeps_order_and_colors(data):
+    image = NodalImage(data=data)
+    whole = _paths(image.dumps())
+    x, y, width, height = image.bounds()
+    image.region = (x + width / 3, y + height / 3, width / 4, height / 4)
+    part = _paths(image.dumps())
+    assert part
+    assert part == [entry for entry in whole if entry in set(part)]
+
+
+def test_script_hues_match_smil(data):
+    image = NodalImage(data=data)
+    smil = dict(_paths(image.dumps()))
+    image.interaction = INTERACTION_SCRIPT
+    root = ET.fromstring(image.dumps())
+    hues = dict((path.get('id'), path.get('data-hue'))
+                for path in root.iter(SVG + 'path')
+                if path.get('data-from') is not None)
+    assert hues
+    assert len(set(hues.values())) > 1
+    for dom_id, hue in hues.items():
+        assert smil[dom_id] == 'url(#arrow_head_{0})'.format(hue)
+
+
+@pytest.mark.parametrize('argv', [['--overview', '0'],
+                                  ['--overview', 'wide'],
+                                  ['--precision', '-1'],
+                                  ['--seed', '1', '--hops', '-1']])
+def test_cli_rejects_bad_options(argv, capsys):
+    with pytest.raises(SystemExit) as caught:
+        main(argv + ['in.nod', 'out.svg'])
+    assert caught.value.code == 2
+    assert 'invalid' in capsys.readouterr().err
+
+
+def test_negative_precision(data):
+    image = NodalImage(data=data, precision=-1)
+    with pytest.raises(NodalException):
+        image.dumps()
+
+
+def test_unknown_seed_is_reported(data, tmpdir, capsys):
+    source = tmpdir.join('doc.nod')
+    source.write_binary(data)
+    destination = tmpdir.join('doc.svg')
+    assert main(['--seed', 'nowhere', str(source), str(destination)]) == 1
+    assert 'Unknown Node' in capsys.readouterr().err
+    assert not destination.check()
+
+
+def test_seeds_are_kept_as_a_tuple():
+    assert NodalImage(seeds=['1', '2']).seeds == ('1', '2')
+    assert NodalImage(seeds='1').seeds == ('1',)
+    assert NodalImage().seeds is None
+
+
+def test_failed_dump_leaves_no_file(document, tmpdir):
+    for v in document[ELEMENTS].values():
+        if v.get(TYPE) == TEXTBOX:
+            v[TEXT] = '<div><p>broken</div>'
+    image = NodalImage(data=dumps(document))
+    kept = tmpdir.join('kept.svg')
+    kept.write_binary(b'<svg />')
+    for destination in (tmpdir.join('out.svg'), kept):
+        with pytest.raises(SyntaxError):
+            image.dump(str(destination))
+    assert kept.read_binary() == b'<svg />'
+    assert sorted(path.basename for path in tmpdir.listdir()) == \
+        ['kept.svg']
+
+
+def test_lookup_other_fields(document):
+    key = next(k for k, v in document[ELEMENTS].items()
+               if v.get(TYPE) == NODE)
+    document[ELEMENTS][key]['Velocity'] = 90
+    data = dumps(document)
+    with pytest.raises(NodalException):
+        NodalImage(data=data).lookup('Velocity', 90)
+    for fields in (('Velocity',), None):
+        found = NodalImage(data=data, fields=fields).lookup('Velocity', 90)
+        assert list(found) == [key]
+    assert NodalImage(data=data).lookup(TYPE, 'Comment') == {}
+
+
+def test_phase_stats_count_rendered_elements(data):
+    image = NodalImage(data=data, instrument=True, annotations='none')
+    x, y, width, height = image.bounds()
+    image.region = (x + width / 3, y + height / 3, width / 4, height / 4)
+    edges = _paths(image.dumps())
+    assert 0 < len(edges) < len(image.edges)
+    assert image.stats['edges']['count'] == len(edges)
+    assert 0 < image.stats['nodes']['count'] < len(image.nodes)
+    assert image.stats['text_boxes']['count'] == 0
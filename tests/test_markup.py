@@ -0,0 +1,32 @@
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from nod2svg.constants import *
+from nod2svg.main import NodalImage
+from nod2svg.markup import XHTML_NAMESPACE, Markup
+
+from conftest import dumps
+
+
+def test_inline_declares_namespace():
+    text = Markup.inline('<div><p>Verse</p></div>').text
+    assert text == '<div xmlns="{0}"><p>Verse</p></div>'.format(
+        XHTML_NAMESPACE)
+
+
+def test_inline_keeps_declared_namespace():
+    source = '<div class="a" xmlns="{0}"><p/></div>'.format(XHTML_NAMESPACE)
+    assert Markup.inline(source).text == source
+    source = '<div title=" xmlns=x"/>'
+    ET.fromstring(Markup.inline(source).text)
+
+
+def test_inline_namespaced_text_boxes(document):
+    for element in document[ELEMENTS].values():
+        if element[TYPE] == TEXTBOX:
+            element[TEXT] = '<div xmlns="{0}"><p>Verse</p></div>'.format(
+                XHTML_NAMESPACE)
+    image = NodalImage(data=dumps(document), annotations='inline')
+    ET.fromstring(image.dumps())
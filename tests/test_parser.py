@@ -0,0 +1,54 @@
+import io
+import plistlib
+
+import pytest
+
+from nod2svg.constants import *
+from nod2svg.main import NodalImage
+from nod2svg.parser import parse
+from nod2svg.stats import inspect
+
+
+class Stream(io.RawIOBase):
+    """A readable stream that can't seek, like a socket or pipe."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._data.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _documents(document, data):
+    yield data
+    if hasattr(plistlib, 'dumps'):
+        yield plistlib.dumps(document, fmt=plistlib.FMT_BINARY)
+
+
+def test_parse_streams_that_cannot_seek(document, data):
+    for content in _documents(document, data):
+        expected = parse(io.BytesIO(content))
+        assert parse(Stream(content)) == expected
+        assert inspect(Stream(content)) == inspect(io.BytesIO(content))
+        image = NodalImage(Stream(content))
+        assert len(image.elements) == len(document[ELEMENTS])
+
+
+def test_parse_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse(Stream(b'not a plist'))
+
+
+def test_loads_buffers(data):
+    expected = NodalImage(data=data).dumps()
+    for buffer in (bytearray(data), memoryview(data),
+                   memoryview(bytearray(data))):
+        image = NodalImage()
+        image.loads(buffer)
+        assert image.dumps() == expected
+    assert NodalImage(io.BytesIO(data)).dumps() == expected
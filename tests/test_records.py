@@ -0,0 +1,46 @@
+import pytest
+
+from nod2svg.constants import *
+from nod2svg.main import NodalImage
+from nod2svg.records import Edge, Node, record
+
+
+def test_tick_position_round_trips():
+    fields = {TYPE: NODE, TICKPOS: '{-166320, 332640}', 'Velocity': 90}
+    node = record(fields)
+    assert isinstance(node, Node)
+    assert (node.x, node.y) == (-166320, 332640)
+    assert node[TICKPOS] == '{-166320, 332640}'
+    assert (node[X], node[Y]) == (-166320, 332640)
+    # Coordinates read as X & Y too.
+    expected = dict(fields, **{X: -166320, Y: 332640})
+    assert dict(node) == expected
+    assert dict(record(dict(node))) == expected
+    node[TICKPOS] = '{0, -5}'
+    assert (node.x, node.y, node[TICKPOS]) == (0, -5, '{0, -5}')
+    del node[TICKPOS]
+    assert TICKPOS not in node and X not in node
+
+
+def test_dom_id_round_trips():
+    edge = record({TYPE: EDGE, FROM_NODE: 1, TO_NODE: 2})
+    assert isinstance(edge, Edge)
+    assert DOM_ID not in edge
+    edge.number = 4
+    assert edge[DOM_ID] == edge.dom_id == ID_FORMAT.format(EDGE, 4)
+    assert DOM_ID in dict(edge)
+    edge[DOM_ID] = 'custom'
+    assert edge.dom_id == 'custom'
+    assert list(edge).count(DOM_ID) == 1
+    del edge[DOM_ID]
+    assert edge.dom_id is None
+    with pytest.raises(KeyError):
+        edge[DOM_ID]
+    assert record({TYPE: 'Comment'}) == {TYPE: 'Comment'}
+
+
+def test_loaded_records_name_their_graphics(data):
+    image = NodalImage(data=data)
+    svg = image.dumps()
+    for node in image.nodes.values():
+        assert 'id="{0}"'.format(node[DOM_ID]).encode('ascii') in svg
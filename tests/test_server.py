@@ -0,0 +1,13 @@
+from nod2svg.main import NodalImage
+from nod2svg.server import RenderServer
+
+
+def test_seeds_list_keys_images(data):
+    seed = next(iter(NodalImage(data=data).nodes))
+    server = RenderServer(('127.0.0.1', 0), threads=1, seeds=[seed])
+    try:
+        image = server.render(data, {})
+        assert server.render(data, {'seeds': [seed]}) == image
+        assert server.images.status()['hits'] == 1
+    finally:
+        server.server_close()
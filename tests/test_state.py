@@ -0,0 +1,37 @@
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from nod2svg.main import NodalImage
+
+
+def _view_box(svg):
+    return ET.fromstring(svg).get('viewBox')
+
+
+def test_view_box_is_stable_across_loads(data, tmpdir):
+    path = tmpdir.join('doc.nod')
+    path.write_binary(data)
+    image = NodalImage()
+    image.load(str(path))
+    first = _view_box(image.dumps())
+    for _ in range(3):
+        image.load(str(path))
+        assert _view_box(image.dumps()) == first
+    assert _view_box(NodalImage(str(path)).dumps()) == first
+
+
+def test_dumps_is_repeatable_and_follows_options(data):
+    image = NodalImage(data=data)
+    first = image.dumps()
+    assert image.dumps() == first
+    assert ET.tostring(image.generate()) == ET.tostring(image.generate())
+    image.stylesheet = True
+    styled = image.dumps()
+    assert styled != first
+    assert b'class="node"' in styled
+    image.stylesheet = False
+    assert image.dumps() == first
+    image.invalidate()
+    assert image.dumps() == first
@@ -0,0 +1,19 @@
+import io
+import plistlib
+
+from nod2svg.constants import *
+from nod2svg.main import NodalImage
+from nod2svg.stats import inspect
+
+
+def test_inspect_matches_loaded_document(document, data):
+    stats = inspect(io.BytesIO(data))
+    image = NodalImage(data=data)
+    assert stats['elements'] == len(image.elements)
+    assert stats['nodes'] == len(image.nodes)
+    assert stats['edges'] == len(image.edges)
+    assert stats['text_boxes'] == len(image.textboxes)
+    assert stats['bounds'] == list(image.mbr)
+    if hasattr(plistlib, 'dumps'):
+        binary = plistlib.dumps(document, fmt=plistlib.FMT_BINARY)
+        assert inspect(io.BytesIO(binary)) == stats
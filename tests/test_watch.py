@@ -0,0 +1,53 @@
+import os
+
+from nod2svg.watch import Watcher
+
+
+def test_poll_debounces_saves(data, tmpdir):
+    source = tmpdir.join('doc.nod')
+    destination = tmpdir.join('doc.svg')
+    source.write_binary(data)
+    os.utime(str(source), (100, 100))
+    watcher = Watcher(jobs=[(str(source), str(destination))], debounce=1)
+
+    def converted(now):
+        return [result.error for result in watcher.poll(now)]
+    assert converted(0) == []
+    assert converted(.5) == []
+    assert converted(1) == [None]
+    assert destination.check()
+    assert converted(2) == []
+    # A burst of saves is converted once, after the last one settles.
+    os.utime(str(source), (200, 200))
+    assert converted(3) == []
+    os.utime(str(source), (300, 300))
+    assert converted(3.6) == []
+    assert converted(4.5) == []
+    assert converted(4.7) == [None]
+    assert converted(10) == []
+
+
+def test_walk_only_when_directories_change(data, tmpdir, monkeypatch):
+    nested = tmpdir.mkdir('docs').mkdir('nested')
+    nested.join('a.nod').write_binary(data)
+    os.utime(str(nested), (100, 100))
+    watcher = Watcher([str(tmpdir.join('docs'))], str(tmpdir.join('svg')))
+    walks = []
+    walk = os.walk
+
+    def counted(path):
+        walks.append(path)
+        return walk(path)
+    monkeypatch.setattr(os, 'walk', counted)
+    assert [os.path.basename(source) for source, _ in watcher.walk()] == \
+        ['a.nod']
+    assert len(walks) == 2
+    watcher.walk()
+    watcher.walk()
+    assert len(walks) == 2
+    # A new document changes its directory, which is walked again.
+    nested.join('b.nod').write_binary(data)
+    os.utime(str(nested), (200, 200))
+    assert [os.path.basename(source) for source, _ in watcher.walk()] == \
+        ['a.nod', 'b.nod']
+    assert len(walks) == 4
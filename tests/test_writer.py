@@ -0,0 +1,80 @@
+import bz2
+import gzip
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+import pytest
+
+from nod2svg.constants import *
+from nod2svg.main import XML_DECLARATION, NodalImage
+from nod2svg.markup import Markup
+from nod2svg.writer import StreamWriter, TreeWriter
+
+from conftest import dumps
+
+MATHML = ('<div xmlns:m="http://www.w3.org/1998/Math/MathML">'
+          '<m:math><m:mi>x</m:mi></m:math></div>')
+TEXTS = (MATHML,
+         '<div xmlns="http://www.w3.org/1999/xhtml"><p>Verse</p></div>',
+         '<div><p>Plain &amp; simple</p></div>')
+
+
+def _emit(w):
+    w.start('svg', {'xmlns': 'http://www.w3.org/2000/svg',
+                    'xmlns:xlink': 'http://www.w3.org/1999/xlink'})
+    w.subtree(ET.fromstring(
+        '<g xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" '
+        'xmlns:d="urn:data"><use xlink:href="#a" d:key="1" /></g>'))
+    w.start('foreignObject', {})
+    w.markup(Markup.parse(MATHML))
+    w.end('foreignObject')
+    w.end('svg')
+
+
+def test_stream_matches_tree():
+    tree = TreeWriter()
+    _emit(tree)
+    stream = StreamWriter()
+    _emit(stream)
+    assert stream.close() == ET.tostring(tree.close())
+
+
+def test_dumps_matches_generate(document):
+    texts = [v for v in document[ELEMENTS].values()
+             if v.get(TYPE) == TEXTBOX]
+    for index, v in enumerate(texts):
+        v[TEXT] = TEXTS[index % len(TEXTS)]
+    image = NodalImage(data=dumps(document))
+    assert image.dumps() == ET.tostring(image.generate())
+    assert image.dumps().count(b'xmlns="http://www.w3.org/1999/xhtml"') == \
+        len(texts)
+
+
+def _decompressors():
+    yield 'svgz', gzip.decompress if hasattr(gzip, 'decompress') else None
+    yield 'svg.bz2', bz2.decompress
+    try:
+        import lzma
+    except ImportError:
+        yield 'svg.xz', None
+    else:
+        yield 'svg.xz', lzma.decompress
+
+
+@pytest.mark.parametrize('extension, decompress', list(_decompressors()))
+def test_compressed_output(extension, decompress, data, tmpdir):
+    if decompress is None:
+        pytest.skip('codec not supported by this Python')
+    image = NodalImage(data=data)
+    expected = XML_DECLARATION + image.dumps()
+    path = tmpdir.join('out.' + extension)
+    image.dump(str(path))
+    assert decompress(path.read_binary()) == expected
+    # Streamed rather than from the memoized bytes.
+    image.invalidate()
+    image.dump(str(path))
+    assert decompress(path.read_binary()) == expected